@@ -0,0 +1,224 @@
+"""
+Asyncio HTTP/1.1 front end for the SAXV Flask nodes (standard library only).
+
+    from saxv_async_server import serve
+    serve(app, port=5000, slow_paths=('/mine',))
+
+Connections live on one event loop, so thousands of idle or keep-alive
+clients cost a coroutine each instead of a thread. Requests are handed to the
+Flask (WSGI) app on a worker pool; slow paths such as mining or a consensus
+round run on their own small pool so they never hold up light reads.
+Streamed responses are pulled chunk by chunk and written with backpressure.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote
+
+REQUEST_WORKERS = 32    # threads running ordinary (fast) handlers
+SLOW_WORKERS = 2        # threads for slow_paths, e.g. proof of work
+MAX_HEADER = 64 * 1024  # bytes of request line + headers
+MAX_BODY = 16 * 1024 * 1024
+KEEPALIVE_TIMEOUT = 15  # seconds an idle connection is kept open
+BACKLOG = 1024
+
+# statuses that never carry a body, whatever the app returns
+NO_BODY = {HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED}
+
+def serve(app, host='0.0.0.0', port=5000, slow_paths=(), workers=REQUEST_WORKERS, slow_workers=SLOW_WORKERS,
+          reuse_port=False):
+    """
+    Serve app until interrupted. With reuse_port several processes can listen on
+    the same port and the kernel spreads connections over them (SO_REUSEPORT).
+    """
+    server = AsyncServer(app, slow_paths, workers, slow_workers)
+    try:
+        asyncio.run(server.serve_forever(host, port, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+class AsyncServer:
+    def __init__(self, app, slow_paths=(), workers=REQUEST_WORKERS, slow_workers=SLOW_WORKERS):
+        self.app = app
+        self.slow_paths = set(slow_paths)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slow_pool = ThreadPoolExecutor(max_workers=slow_workers)
+        self.server_port = 0
+
+    async def serve_forever(self, host, port, reuse_port=False):
+        server = await asyncio.start_server(self._client, host, port, limit=MAX_HEADER, backlog=BACKLOG,
+                                            reuse_port=reuse_port or None)
+        self.server_port = port
+        async with server:
+            await server.serve_forever()
+
+    async def _client(self, reader, writer):
+        peer = writer.get_extra_info('peername') or ('', 0)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except asyncio.LimitOverrunError:
+                    await self._error(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._error(writer, HTTPStatus.BAD_REQUEST)
+                    break
+                headers = []
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers.append((name.strip(), value.strip()))
+                lookup = {name.lower(): value for name, value in headers}
+                if 'chunked' in lookup.get('transfer-encoding', '').lower():
+                    await self._error(writer, HTTPStatus.LENGTH_REQUIRED)
+                    break
+                try:
+                    length = int(lookup.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY:
+                    await self._error(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE if length > 0
+                                      else HTTPStatus.BAD_REQUEST)
+                    break
+                if length and version == 'HTTP/1.1' and lookup.get('expect', '').lower() == '100-continue':
+                    # clients such as curl and requests wait for this before sending a large body
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                    await writer.drain()
+                try:
+                    body = await asyncio.wait_for(reader.readexactly(length), KEEPALIVE_TIMEOUT) if length else b''
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                connection = lookup.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                environ = self._environ(method, target, version, headers, body, peer)
+                pool = self.slow_pool if environ['PATH_INFO'] in self.slow_paths else self.pool
+                status, response_headers, chunks = await loop.run_in_executor(pool, self._call, environ)
+                keep_alive = await self._respond(writer, pool, method, version, status,
+                                                 response_headers, chunks, keep_alive)
+                if not keep_alive:
+                    break
+        except Exception:
+            # client went away, or a streamed body failed halfway: drop the connection
+            pass
+        finally:
+            writer.close()
+
+    def _environ(self, method, target, version, headers, body, peer):
+        path, _, query = target.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': unquote(path, encoding='latin-1'),
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': str(self.server_port),
+            'SERVER_PROTOCOL': version,
+            'REMOTE_ADDR': peer[0],
+            'REMOTE_PORT': str(peer[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers:
+            key = name.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _call(self, environ):
+        """
+        Run the WSGI app on a worker thread. A response with a Content-Length is
+        collected here; anything else is returned as an iterator to stream.
+        """
+        started = {}
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            started['status'], started['headers'] = status, headers
+            return written.append
+
+        try:
+            result = self.app(environ, start_response)
+            if not any(name.lower() == 'content-length' for name, _ in started['headers']):
+                return started['status'], started['headers'], self._chunks(written, result)
+            try:
+                return started['status'], started['headers'], written + list(result)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except Exception:
+            return '500 Internal Server Error', [('Content-Length', '0')], []
+
+    @staticmethod
+    def _chunks(written, result):
+        try:
+            yield from written
+            yield from result
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    async def _respond(self, writer, pool, method, version, status, headers, chunks, keep_alive):
+        """
+        Write one response; returns whether the connection stays open
+        """
+        code = int(status.split(' ', 1)[0])
+        has_length = any(name.lower() == 'content-length' for name, _ in headers)
+        no_body = method == 'HEAD' or code < 200 or code in NO_BODY
+        # a body of unknown length is chunked on HTTP/1.1, ended by closing on HTTP/1.0
+        chunked = not has_length and not no_body and version == 'HTTP/1.1'
+        if not has_length and not no_body and not chunked:
+            keep_alive = False
+        lines = [f"HTTP/1.1 {status}"] + [f"{name}: {value}" for name, value in headers
+                                          if name.lower() not in ('connection', 'transfer-encoding')]
+        if chunked:
+            lines.append("Transfer-Encoding: chunked")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+        if isinstance(chunks, list):
+            if not no_body:
+                writer.write(b''.join(chunks))
+            await writer.drain()
+            return keep_alive
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(pool, next, chunks, None)
+                if chunk is None:
+                    break
+                if no_body or not chunk:
+                    continue
+                writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()
+            if chunked:
+                writer.write(b'0\r\n\r\n')
+            await writer.drain()
+        finally:
+            await loop.run_in_executor(pool, chunks.close)
+        return keep_alive
+
+    @staticmethod
+    async def _error(writer, status):
+        status = HTTPStatus(status)
+        writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Length: 0\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1'))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
@@ -1,8 +1,12 @@
 import hashlib
 import json
+import sys
 from time import time
 from uuid import uuid4
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+
+MAX_RANGE = 200  # max header/block per respons /headers dan /blocks
+MAX_TX_SUBMIT = 5000  # max transaksi per request /transactions/batch
 
 # ======= Blockchain Class =======
 class Blockchain:
@@ -32,6 +36,26 @@ class Blockchain:
         })
         return self.last_block['index'] + 1
 
+    def new_transactions(self, entries):
+        """
+        Tambah banyak transaksi sekaligus. Return satu hasil per transaksi,
+        urutannya sama dengan entries: {'status': 'accepted' | 'invalid', 'tx_hash': ...}
+        """
+        required = ['sender', 'recipient', 'amount']
+        results = []
+        for entry in entries:
+            if isinstance(entry, dict) and all(k in entry for k in required):
+                transaction = {k: entry[k] for k in required}
+                self.current_transactions.append(transaction)
+                results.append({'status': 'accepted', 'tx_hash': self.tx_hash(transaction)})
+            else:
+                results.append({'status': 'invalid'})
+        return results
+
+    @staticmethod
+    def tx_hash(tx):
+        return hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+
     @staticmethod
     def hash(block):
         block_string = json.dumps(block, sort_keys=True).encode()
@@ -93,13 +117,86 @@ def new_transaction():
     index = blockchain.new_transaction(values['sender'], values['recipient'], values['amount'])
     return jsonify({'message': f'Transaction will be added to Block {index}'}), 201
 
+# banyak transaksi dalam satu request: {"transactions": [...]}
+@app.route('/transactions/batch', methods=['POST'])
+def new_transaction_batch():
+    values = request.get_json()
+    txs = values.get('transactions') if isinstance(values, dict) else None
+    if not isinstance(txs, list):
+        return 'Missing values', 400
+    if len(txs) > MAX_TX_SUBMIT:
+        return jsonify({'message': f'Maksimal {MAX_TX_SUBMIT} transaksi per batch'}), 413
+
+    results = blockchain.new_transactions(txs)
+    return jsonify({
+        'accepted': sum(result['status'] == 'accepted' for result in results),
+        'results': results,
+        'block': blockchain.last_block['index'] + 1,
+    }), 200
+
+def stream_blocks(blocks, start, stop):
+    # satu block per baris, diserialisasi saat dikirim
+    for i in range(start, stop):
+        yield json.dumps(blocks[i]) + '\n'
+
+# ?offset=&limit= untuk satu halaman, ?stream=1 untuk NDJSON chunked
 @app.route('/chain', methods=['GET'])
 def full_chain():
+    blocks = blockchain.chain
+    length = len(blocks)
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return 'Invalid offset/limit', 400
+    stop = length if limit is None else min(length, offset + limit)
+    if request.args.get('stream'):
+        return Response(stream_blocks(blocks, offset, stop), mimetype='application/x-ndjson',
+                        headers={'X-Chain-Length': str(length)})
     response = {
-        'chain': blockchain.chain,
-        'length': len(blockchain.chain),
+        'chain': blocks[offset:stop],
+        'length': length,
     }
     return jsonify(response), 200
 
+def _range_args():
+    # ?from=H&count=N, count dibatasi MAX_RANGE
+    start = request.args.get('from', 0, type=int)
+    count = request.args.get('count', MAX_RANGE, type=int)
+    if start < 0 or count < 0:
+        return None
+    return start, min(count, MAX_RANGE)
+
+@app.route('/headers', methods=['GET'])
+def headers_range():
+    parsed = _range_args()
+    if parsed is None:
+        return 'Invalid range', 400
+    start, count = parsed
+    headers = [{
+        'index': block['index'],
+        'timestamp': block['timestamp'],
+        'proof': block['proof'],
+        'previous_hash': block['previous_hash'],
+        'hash': blockchain.hash(block),
+    } for block in blockchain.chain[start:start + count]]
+    return jsonify({'from': start, 'headers': headers, 'length': len(blockchain.chain)}), 200
+
+@app.route('/blocks', methods=['GET'])
+def blocks_range():
+    parsed = _range_args()
+    if parsed is None:
+        return 'Invalid range', 400
+    start, count = parsed
+    return jsonify({
+        'from': start,
+        'blocks': blockchain.chain[start:start + count],
+        'length': len(blockchain.chain),
+    }), 200
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    # --async-server: layani API lewat event loop asyncio, /mine di worker terpisah
+    if '--async-server' in sys.argv[1:]:
+        from saxv_async_server import serve
+        serve(app, port=5000, slow_paths=('/mine',), slow_workers=1)
+    else:
+        app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
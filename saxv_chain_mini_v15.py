@@ -12,6 +12,10 @@ from ecdsa import SigningKey, SECP256k1
 
 # ==== BLOCKCHAIN ====
 class Block:
+    # hashed fields in canonical (sorted) order; the hash itself is never hashed
+    FIELDS = ('index', 'nonce', 'previous_hash', 'timestamp', 'transactions')
+    __slots__ = FIELDS + ('hash',)
+
     def __init__(self, index, timestamp, transactions, previous_hash):
         self.index = index
         self.timestamp = timestamp
@@ -20,10 +24,18 @@ class Block:
         self.nonce = 0
         self.hash = self.compute_hash()
 
+    def fields(self):
+        return {name: getattr(self, name) for name in Block.FIELDS}
+
     def compute_hash(self):
-        block_string = json.dumps(self.__dict__, sort_keys=True)
+        block_string = json.dumps(self.fields(), sort_keys=True)
         return hashlib.sha256(block_string.encode()).hexdigest()
 
+    def to_dict(self):
+        data = self.fields()
+        data['hash'] = self.hash
+        return data
+
 class Blockchain:
     def __init__(self):
         self.chain = []
@@ -55,7 +67,7 @@ class Blockchain:
 
     def snapshot_chain(self):
         with gzip.open("saxv_chain_snapshot.json.gz", "wt", encoding="utf-8") as f:
-            json.dump([block.__dict__ for block in self.chain], f)
+            json.dump([block.to_dict() for block in self.chain], f)
         print("[Snapshot] Blockchain saved to cloud-ready gzip file")
 
     def is_chain_valid(self):
@@ -6,13 +6,17 @@
 import hashlib
 import json
 import time
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 import threading
 
 # ------------------------------------------
 # Block structure
 # ------------------------------------------
 class Block:
+    # hashed fields in canonical (sorted) order; the hash itself is never hashed
+    FIELDS = ('index', 'nonce', 'previous_hash', 'timestamp', 'transactions')
+    __slots__ = FIELDS + ('hash',)
+
     def __init__(self, index, timestamp, transactions, previous_hash, nonce=0):
         self.index = index
         self.timestamp = timestamp
@@ -21,9 +25,38 @@ class Block:
         self.nonce = nonce
         self.hash = self.compute_hash()
 
+    def fields(self):
+        return {name: getattr(self, name) for name in Block.FIELDS}
+
+    def encoded_parts(self):
+        """
+        Canonical JSON of FIELDS split around the nonce value
+        """
+        parts = [f'"{name}": {json.dumps(getattr(self, name), sort_keys=True)}' for name in Block.FIELDS]
+        at = Block.FIELDS.index('nonce')
+        head = '{' + ''.join(part + ', ' for part in parts[:at]) + '"nonce": '
+        tail = ''.join(', ' + part for part in parts[at + 1:]) + '}'
+        return head, tail
+
     def compute_hash(self):
-        block_string = json.dumps(self.__dict__, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        head, tail = self.encoded_parts()
+        return hashlib.sha256(f'{head}{self.nonce}{tail}'.encode()).hexdigest()
+
+    def mine(self, difficulty):
+        """
+        Search nonces until the hash meets difficulty; the fixed fields are encoded once
+        """
+        head, tail = self.encoded_parts()
+        target = '0' * difficulty
+        while not self.hash.startswith(target):
+            self.nonce += 1
+            self.hash = hashlib.sha256(f'{head}{self.nonce}{tail}'.encode()).hexdigest()
+        return self.hash
+
+    def to_dict(self):
+        data = self.fields()
+        data['hash'] = self.hash
+        return data
 
 # ------------------------------------------
 # Blockchain core
@@ -54,10 +87,7 @@ class Blockchain:
         return True
 
     def proof_of_work(self, block):
-        while not block.hash.startswith('0' * Blockchain.difficulty):
-            block.nonce += 1
-            block.hash = block.compute_hash()
-        return block.hash
+        return block.mine(Blockchain.difficulty)
 
     def add_block(self, block, proof):
         previous_hash = self.get_last_block().hash
@@ -74,15 +104,19 @@ class Blockchain:
             return False
 
         last_block = self.get_last_block()
+        # salinan: /new_transaction bisa append selama proof of work,
+        # tx itu tidak boleh masuk block tanpa ikut ter-hash
+        transactions = list(self.unconfirmed_transactions)
         new_block = Block(
             index=last_block.index + 1,
             timestamp=time.time(),
-            transactions=self.unconfirmed_transactions,
+            transactions=transactions,
             previous_hash=last_block.hash
         )
         proof = self.proof_of_work(new_block)
         self.add_block(new_block, proof)
-        self.unconfirmed_transactions = []
+        # buang yang sudah masuk block saja, tx baru tetap antre
+        del self.unconfirmed_transactions[:len(transactions)]
         return new_block.index
 
 # ------------------------------------------
@@ -91,11 +125,27 @@ class Blockchain:
 app = Flask(__name__)
 blockchain = Blockchain()
 
+def stream_blocks(blocks, start, stop):
+    # satu block per baris, diserialisasi saat dikirim (RAM tetap kecil)
+    for i in range(start, stop):
+        yield json.dumps(blocks[i].to_dict()) + '\n'
+
 @app.route('/chain', methods=['GET'])
 def get_chain():
-    chain_data = [block.__dict__ for block in blockchain.chain]
+    # ?offset=&limit= untuk satu halaman, ?stream=1 untuk NDJSON chunked
+    blocks = blockchain.chain
+    length = len(blocks)
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return "Invalid offset/limit", 400
+    stop = length if limit is None else min(length, offset + limit)
+    if request.args.get('stream'):
+        return Response(stream_blocks(blocks, offset, stop), mimetype='application/x-ndjson',
+                        headers={'X-Chain-Length': str(length)})
+    chain_data = [block.to_dict() for block in blocks[offset:stop]]
     return jsonify({
-        "length": len(chain_data),
+        "length": length,
         "chain": chain_data
     })
 
@@ -3,8 +3,13 @@
 saxv_chain_mini_v6.py
 Minimal multi-node blockchain (SAXV Chain Mini v6)
 - Lightweight PoW
-- Peer registration + simple longest-chain consensus
+- Peer registration + longest-chain consensus (fork-point sync)
+- Peer discovery via /nodes/peers: MAX_OUTBOUND active peers plus an address book
+- New blocks announced to peers right after mining, relayed as compact blocks
+- Mempool gossip: tx hashes announced in batches, peers fetch only what they miss
 - Persistent file storage per node (chain_{port}.json)
+- Headers-only light client mode (--light) for phones
+- Binary TCP peer protocol (port + 1000) for block/tx relay; HTTP API stays for clients
 Designed to run on resource-limited devices (Pydroid 3 / Acode)
 """
 
@@ -13,18 +18,30 @@ import json
 import time
 import os
 import sys
+import random
+import zlib
+import argparse
+import asyncio
+import atexit
+import mmap
+import struct
+import subprocess
 import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeout
 from uuid import uuid4
 from urllib.parse import urlparse
 
 try:
     from flask import Flask, jsonify, request
+    from werkzeug.middleware.proxy_fix import ProxyFix
 except Exception as e:
     print("ERROR: Flask not found. Install with: pip install Flask")
     raise
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except Exception as e:
     print("ERROR: requests not found. Install with: pip install requests")
     raise
@@ -33,19 +50,203 @@ except Exception as e:
 DIFFICULTY = 2  # number of leading zeros required in hash (keep very small on HP)
 MAX_TX_BATCH = 20  # max txs per block (keep small)
 STORAGE_DIR = "."  # where chain files are saved
+PEER_WORKERS = 8  # peers contacted concurrently per consensus round
+ROUND_DEADLINE = 8  # seconds; slower peers are ignored for this round
+MAX_RANGE = 200  # max headers/blocks per /headers or /blocks response
+POOL_HOSTS = 16  # peer hosts whose keep-alive connections are kept
+POOL_SIZE = PEER_WORKERS  # keep-alive connections per peer host
+# (connect, read) timeouts in seconds per kind of peer call
+TIMEOUTS = {
+    'probe': (2, 3),      # tip headers, hash probes, status, announcements
+    'download': (2, 10),  # /blocks and /headers ranges of up to MAX_RANGE items
+    'forward': (2, None),  # read worker -> writer; /mine takes as long as proof of work
+}
+BACKOFF_BASE = 5  # seconds a peer is skipped after its first failure, doubling per failure
+BACKOFF_MAX = 600  # cap on that backoff
+QUARANTINE_TIME = 1800  # seconds a peer is ignored per invalid chain it served
+GOSSIP_INTERVAL = 2  # seconds between transaction announcements
+GOSSIP_BATCH = 100  # max tx hashes per announcement (and txs per relay)
+SEEN_TX_LIMIT = 10000  # tx hashes remembered to stop re-relay loops
+SHORT_ID_LEN = 12  # hex chars of a tx hash used as its short id in compact blocks
+P2P_PORT_OFFSET = 1000  # default TCP peer port is the HTTP port plus this
+P2P_TIMEOUT = 5  # seconds to wait for a reply on a peer link
+P2P_DIAL_INTERVAL = 10  # seconds between dialing unlinked peers (and pinging linked ones)
+MAX_FRAME = 16 * 1024 * 1024  # largest accepted peer message, bytes
+MAX_OUTBOUND = 8  # active peers polled, announced to and gossiped with
+ADDRESS_BOOK_SIZE = 1000  # known peer addresses kept for discovery
+PEER_EXCHANGE_COUNT = 50  # addresses handed out per /nodes/peers answer
+DISCOVERY_INTERVAL = 60  # seconds between peer list exchanges
+TIP_INTERVAL = 5  # seconds between background checks for a better tip
+WRITER_PORT_OFFSET = 2000  # with read workers the writer listens on localhost at the HTTP port plus this
+SNAPSHOT_INTERVAL = 0.2  # seconds between snapshot publishes for read workers
+MEMPOOL_LIMIT = 5000  # pending transactions kept; new ones are refused beyond this
+CLIENT_TX_RATE = 5  # transactions per second one client may submit to /transactions/new
+CLIENT_TX_BURST = 20  # ... with bursts up to this many
+CLIENT_LIMIT = 10000  # clients whose rate buckets are remembered
+FLUSH_INTERVAL = 2  # seconds between saves of mempool-only changes
+MAX_TX_SUBMIT = 5000  # transactions per /transactions/batch request
+CLIENT_BULK_RATE = 1000  # transactions per second one client may submit through /transactions/batch
+CLIENT_BULK_BURST = MAX_TX_SUBMIT  # ... with bursts up to one full batch
 # -------------------------------------------------------
 
+# one keep-alive session shared by all peer traffic, pooled per host
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE))
+
+# fields covered by the block hash; transactions are committed through merkle_root
+HEADER_FIELDS = ('index', 'timestamp', 'merkle_root', 'proof', 'previous_hash')
+
+# peer link frames: payload length and message type, then a compact JSON payload
+FRAME = struct.Struct('!IB')
+(MSG_HANDSHAKE, MSG_PING, MSG_INV, MSG_GETBLOCKS, MSG_GETCOMPACT,
+ MSG_GETBLOCKTXN, MSG_GETTX, MSG_REPLY) = range(8)
+
+# chain snapshot file shared with read worker processes: magic, block count
+SNAPSHOT_HEAD = struct.Struct('=8sQ')
+SNAPSHOT_MAGIC = b'SAXVSNP1'
+
+# per-connection headers a read worker does not pass on when forwarding
+HOP_HEADERS = {'connection', 'keep-alive', 'transfer-encoding', 'host', 'content-length'}
+
+class PeerManager:
+    """
+    Health of known peers: latency (moving average), failure streak and invalid-chain
+    offenses. Failing peers are backed off exponentially, peers that served invalid
+    blocks are quarantined, and the rest are handed out fastest first.
+    """
+    def __init__(self):
+        self.stats = {}  # node -> health record, see _entry
+        self.lock = threading.Lock()
+
+    def _entry(self, node):
+        return self.stats.setdefault(node, {'latency': None, 'failures': 0, 'retry_at': 0.0,
+                                            'offenses': 0, 'quarantined_until': 0.0})
+
+    def record_success(self, node, latency):
+        with self.lock:
+            entry = self._entry(node)
+            previous = entry['latency']
+            entry['latency'] = latency if previous is None else 0.7 * previous + 0.3 * latency
+            entry['failures'] = 0
+            entry['retry_at'] = 0.0
+
+    def record_failure(self, node):
+        with self.lock:
+            entry = self._entry(node)
+            entry['failures'] += 1
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (entry['failures'] - 1))
+            entry['retry_at'] = time.time() + backoff
+
+    def record_invalid(self, node):
+        with self.lock:
+            entry = self._entry(node)
+            entry['offenses'] += 1
+            entry['quarantined_until'] = time.time() + QUARANTINE_TIME * entry['offenses']
+
+    def ranked(self, nodes):
+        """
+        Peers that may be contacted now, fastest first (unmeasured peers count as fast)
+        """
+        now = time.time()
+        with self.lock:
+            ready = [n for n in nodes
+                     if now >= self._entry(n)['retry_at'] and now >= self._entry(n)['quarantined_until']]
+            return sorted(ready, key=lambda n: self.stats[n]['latency'] or 0.0)
+
+    def backed_off(self, nodes):
+        """
+        Peers only waiting out a failure backoff (not quarantined), soonest retry first
+        """
+        now = time.time()
+        with self.lock:
+            waiting = [n for n in nodes
+                       if now < self._entry(n)['retry_at'] and now >= self._entry(n)['quarantined_until']]
+            return sorted(waiting, key=lambda n: self.stats[n]['retry_at'])
+
+    def latency(self, node):
+        entry = self.stats.get(node)
+        return (entry['latency'] or 0.0) if entry else 0.0
+
+    def snapshot(self):
+        with self.lock:
+            return {node: dict(entry) for node, entry in self.stats.items()}
+
+class RateLimiter:
+    """
+    Token bucket per client: rate tokens per second, holding at most burst.
+    Only the most recently seen max_clients buckets are kept.
+    """
+    def __init__(self, rate, burst, max_clients=CLIENT_LIMIT):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets = {}  # client -> (tokens, last refill), least recently seen first
+        self.lock = threading.Lock()
+
+    def acquire(self, client):
+        """
+        Take one token for client.
+        Returns 0 if admitted, otherwise the seconds until a token is available.
+        """
+        return self.take(client, 1)[1]
+
+    def take(self, client, count):
+        """
+        Take up to count tokens for client, as many as the bucket holds.
+        Returns (tokens granted, seconds until the rest could be granted, 0 if none are left).
+        """
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            granted = min(count, int(tokens))
+            tokens -= granted
+            wait = 0 if granted == count else (min(count - granted, self.burst) - tokens) / self.rate
+            self.buckets[client] = (tokens, now)
+            if len(self.buckets) > self.max_clients:
+                del self.buckets[next(iter(self.buckets))]
+        return granted, wait
+
 class SAXVChain:
-    def __init__(self, node_id, port):
+    def __init__(self, node_id, port, public_port=None):
+        # chain and mempool are copy-on-write: writers (mining, splicing in peer blocks,
+        # mempool changes) hold write_lock and publish a new tuple/list, readers take
+        # self.chain once and work on that snapshot without locking
         self.current_transactions = []
-        self.chain = []
-        self.nodes = set()
+        self.chain = ()
+        self.write_lock = threading.RLock()
+        # peer sets below are copy-on-write the same way
+        self.nodes = set()  # active outbound peers, at most MAX_OUTBOUND
+        self.address_book = {}  # every known peer address -> last time it was seen
+        self.self_addresses = set()  # addresses that turned out to be this node
+        self.peer_tags = {}  # node -> (ETag, length) last seen from that peer
+        self.peers = PeerManager()
+        # one consensus round at a time; tip_checked is when the last one finished
+        self.sync_lock = threading.Lock()
+        self.tip_checked = 0.0
+        # transaction gossip: hashes seen (oldest first) and hashes still to announce
+        self.seen_txs = {}
+        self.tx_inv = []
+        self.tx_lock = threading.Lock()
+        # mempool changed since the last save; flush() persists it
+        self.mempool_dirty = False
+        # background pushes/pulls for new-block announcements
+        self.announcer = ThreadPoolExecutor(max_workers=PEER_WORKERS)
+        # tip probes of each consensus round, kept across rounds
+        self.prober = ThreadPoolExecutor(max_workers=PEER_WORKERS)
+        # peer list exchanges and probes of each discovery round, kept across rounds
+        self.discoverer = ThreadPoolExecutor(max_workers=PEER_WORKERS)
+        self.p2p = None  # P2PNode once the TCP peer port is up
         self.node_id = node_id
         self.port = port
+        # port peers reach us on, if they go through a forwarder or proxy
+        self.public_port = public_port or port
         # load or create genesis
         self.filename = os.path.join(STORAGE_DIR, f"chain_{self.port}.json")
         if os.path.exists(self.filename):
             self._load_chain()
+            for tx in self.current_transactions:
+                self._mark_seen(self.tx_hash(tx))
             print(f"[node {self.port}] Loaded chain from {self.filename} (len={len(self.chain)})")
         else:
             # create genesis block
@@ -55,43 +256,56 @@ class SAXVChain:
 
     def _save_chain(self):
         try:
-            with open(self.filename, "w") as f:
+            # concurrent writers would interleave in the file
+            with self.write_lock, open(self.filename, "w") as f:
+                mempool = self.current_transactions
                 json.dump({
                     "chain": self.chain,
                     "nodes": list(self.nodes),
-                    "current_transactions": self.current_transactions
+                    "address_book": self.address_book,
+                    "current_transactions": mempool
                 }, f)
+            # only once the write went through, and only if no transaction arrived
+            # meanwhile; a failed save is retried on the next flush
+            if self.current_transactions is mempool:
+                self.mempool_dirty = False
         except Exception as e:
             print("[save chain] failed:", e)
 
     def _load_chain(self):
         with open(self.filename, "r") as f:
             data = json.load(f)
-            self.chain = data.get("chain", [])
+            self.chain = tuple(data.get("chain", []))
             self.nodes = set(data.get("nodes", []))
+            self.address_book = data.get("address_book", {n: 0 for n in self.nodes})
             self.current_transactions = data.get("current_transactions", [])
 
     def new_block(self, proof, previous_hash=None):
         """
         Create a new Block in the Blockchain
         """
-        block = {
-            'index': len(self.chain) + 1,
-            'timestamp': time.time(),
-            'transactions': self.current_transactions[:MAX_TX_BATCH],
-            'proof': proof,
-            'previous_hash': previous_hash or self.hash(self.chain[-1]) if self.chain else '1'
-        }
-        # add and clear used transactions
-        self.chain.append(block)
-        # remove included txs from current_transactions
-        self.current_transactions = self.current_transactions[len(block['transactions']):]
-        self._save_chain()
+        with self.write_lock:
+            blocks = self.chain
+            with self.tx_lock:
+                transactions = self.current_transactions[:MAX_TX_BATCH]
+                # remove included txs from current_transactions
+                self.current_transactions = self.current_transactions[len(transactions):]
+            block = {
+                'index': len(blocks) + 1,
+                'timestamp': time.time(),
+                'transactions': transactions,
+                'merkle_root': self.merkle_root([self.tx_hash(tx) for tx in transactions]),
+                'proof': proof,
+                'previous_hash': previous_hash or self.hash(blocks[-1]) if blocks else '1'
+            }
+            self.chain = blocks + (block,)
+            self._save_chain()
         return block
 
     def new_transaction(self, sender, recipient, amount):
         """
-        Adds a transaction to the list of transactions
+        Adds a transaction to the list of transactions.
+        Returns the index of the block it should go into, or None if the mempool is full.
         """
         tx = {
             'sender': sender,
@@ -99,22 +313,276 @@ class SAXVChain:
             'amount': amount,
             'timestamp': time.time()
         }
-        self.current_transactions.append(tx)
-        self._save_chain()
+        # mining rewards belong to this node's block only, so they are not gossiped
+        if not self.accept_transaction(tx, relay=sender != "0"):
+            return None
+        # saved by the next flush(), not once per submission
+        self.mempool_dirty = True
         return self.last_block['index'] + 1 if self.chain else 1
 
+    def new_transactions(self, entries):
+        """
+        Add a batch of submitted transactions with one mempool update.
+        Mining rewards cannot be submitted. Returns one result per entry, in order:
+        {'status': 'accepted' | 'invalid' | 'duplicate' | 'mempool_full', 'tx_hash': ...}
+        """
+        required = ['sender', 'recipient', 'amount']
+        results = []
+        candidates = []  # (result, tx, tx_hash), hashed before taking the lock
+        for entry in entries:
+            if not isinstance(entry, dict) or not all(k in entry for k in required) or entry['sender'] == "0":
+                results.append({'status': 'invalid'})
+                continue
+            tx = {
+                'sender': entry['sender'],
+                'recipient': entry['recipient'],
+                'amount': entry['amount'],
+                'timestamp': time.time()
+            }
+            tx_hash = self.tx_hash(tx)
+            results.append({'status': 'accepted', 'tx_hash': tx_hash})
+            candidates.append((results[-1], tx, tx_hash))
+        added = []
+        with self.tx_lock:
+            room = MEMPOOL_LIMIT - len(self.current_transactions)
+            for result, tx, tx_hash in candidates:
+                if tx_hash in self.seen_txs:
+                    result['status'] = 'duplicate'
+                elif len(added) >= room:
+                    result['status'] = 'mempool_full'
+                else:
+                    self._mark_seen(tx_hash)
+                    self.tx_inv.append(tx_hash)
+                    added.append(tx)
+            if added:
+                self.current_transactions = self.current_transactions + added
+        if added:
+            self.mempool_dirty = True
+        return results
+
+    def flush(self):
+        """
+        Persist mempool changes made since the last save
+        """
+        if self.mempool_dirty:
+            self._save_chain()
+
+    def _mark_seen(self, tx_hash):
+        self.seen_txs[tx_hash] = None
+        if len(self.seen_txs) > SEEN_TX_LIMIT:
+            del self.seen_txs[next(iter(self.seen_txs))]
+
+    def accept_transaction(self, tx, relay=True):
+        """
+        Add a transaction to the mempool unless its hash was seen before or the
+        mempool holds MEMPOOL_LIMIT transactions (mining rewards are always taken);
+        new ones are queued for the next gossip announcement.
+        Returns True if the transaction was added.
+        """
+        tx_hash = self.tx_hash(tx)
+        with self.tx_lock:
+            if tx_hash in self.seen_txs:
+                return False
+            if len(self.current_transactions) >= MEMPOOL_LIMIT and tx.get('sender') != "0":
+                return False
+            self._mark_seen(tx_hash)
+            self.current_transactions = self.current_transactions + [tx]
+            if relay:
+                self.tx_inv.append(tx_hash)
+        return True
+
+    def accept_relayed(self, txs):
+        """
+        Accept well-formed transactions relayed by a peer; reward transactions are refused.
+        Returns the number of new transactions.
+        """
+        required = ['sender', 'recipient', 'amount', 'timestamp']
+        accepted = 0
+        for tx in txs[:GOSSIP_BATCH]:
+            if isinstance(tx, dict) and all(k in tx for k in required) and tx['sender'] != "0":
+                accepted += self.accept_transaction(tx)
+        if accepted:
+            self.mempool_dirty = True
+        return accepted
+
+    def block_interval(self, window=20):
+        """
+        Average seconds between the last window blocks (TIP_INTERVAL before there are two)
+        """
+        recent = self.chain[-window:]
+        if len(recent) < 2:
+            return TIP_INTERVAL
+        return max(1.0, (recent[-1]['timestamp'] - recent[0]['timestamp']) / (len(recent) - 1))
+
+    def mempool_wait(self):
+        """
+        Seconds until the mempool has room again: each block takes MAX_TX_BATCH
+        transactions off the queue, so an overflow of n needs n / MAX_TX_BATCH blocks
+        """
+        overflow = len(self.current_transactions) - MEMPOOL_LIMIT + 1
+        blocks = max(1, -(-overflow // MAX_TX_BATCH))
+        return blocks * self.block_interval()
+
+    def missing_transactions(self, hashes):
+        """
+        The announced hashes we have never seen, i.e. the ones worth requesting
+        """
+        with self.tx_lock:
+            return [h for h in hashes[:GOSSIP_BATCH] if h not in self.seen_txs]
+
+    def drop_confirmed(self, blocks):
+        """
+        Remove transactions included in blocks received from peers from the mempool
+        """
+        confirmed = {self.tx_hash(tx) for block in blocks for tx in block.get('transactions', [])}
+        if not confirmed:
+            return
+        with self.tx_lock:
+            for tx_hash in confirmed:
+                self._mark_seen(tx_hash)
+            self.current_transactions = [tx for tx in self.current_transactions
+                                         if self.tx_hash(tx) not in confirmed]
+
     @staticmethod
     def hash(block):
         """
-        Creates a SHA-256 hash of a Block
+        Creates a SHA-256 hash of a Block header.
+        Blocks written before merkle roots were introduced are hashed in full.
         """
+        if 'merkle_root' in block:
+            block = {k: block[k] for k in HEADER_FIELDS}
         # We must ensure the Dictionary is ordered, or we'll have inconsistent hashes
         block_string = json.dumps(block, sort_keys=True).encode()
         return hashlib.sha256(block_string).hexdigest()
 
+    @staticmethod
+    def tx_hash(tx):
+        """
+        Creates a SHA-256 hash of a transaction
+        """
+        return hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def _merkle_parent(left, right):
+        return hashlib.sha256((left + right).encode()).hexdigest()
+
+    @staticmethod
+    def merkle_root(hashes):
+        """
+        Merkle root over a list of transaction hashes (last hash duplicated on odd levels)
+        """
+        if not hashes:
+            return "0" * 64
+        level = list(hashes)
+        while len(level) > 1:
+            if len(level) % 2:
+                level.append(level[-1])
+            level = [SAXVChain._merkle_parent(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+        return level[0]
+
+    @staticmethod
+    def merkle_proof(hashes, position):
+        """
+        Inclusion proof for hashes[position]: sibling hashes from leaf to root
+        """
+        proof = []
+        level = list(hashes)
+        while len(level) > 1:
+            if len(level) % 2:
+                level.append(level[-1])
+            sibling = position ^ 1
+            proof.append({'hash': level[sibling], 'position': 'left' if sibling < position else 'right'})
+            level = [SAXVChain._merkle_parent(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+            position //= 2
+        return proof
+
+    @staticmethod
+    def verify_merkle_proof(tx_hash, proof, root):
+        """
+        Check that tx_hash is committed to by root
+        """
+        current = tx_hash
+        for step in proof:
+            if step['position'] == 'left':
+                current = SAXVChain._merkle_parent(step['hash'], current)
+            else:
+                current = SAXVChain._merkle_parent(current, step['hash'])
+        return current == root
+
+    @staticmethod
+    def header(block):
+        """
+        Header of a block as served to light clients.
+        Legacy blocks carry their hash since it cannot be rebuilt without transactions.
+        """
+        if 'merkle_root' in block:
+            return {k: block[k] for k in HEADER_FIELDS}
+        return {
+            'index': block['index'],
+            'timestamp': block['timestamp'],
+            'proof': block['proof'],
+            'previous_hash': block['previous_hash'],
+            'hash': SAXVChain.hash(block)
+        }
+
+    @staticmethod
+    def header_hash(header):
+        if 'merkle_root' in header:
+            return SAXVChain.hash(header)
+        return header['hash']
+
+    def transactions_for(self, address, start=0):
+        """
+        Confirmed transactions sent or received by address in blocks from height start on,
+        with inclusion proofs. Returns (entries, number of blocks scanned up to).
+        """
+        found = []
+        blocks = self.chain  # one snapshot for the whole scan
+        for height in range(max(start, 0), len(blocks)):
+            block = blocks[height]
+            hashes = None
+            for position, tx in enumerate(block['transactions']):
+                if not isinstance(tx, dict) or address not in (tx.get('sender'), tx.get('recipient')):
+                    continue
+                entry = {'transaction': tx, 'height': height}
+                if 'merkle_root' in block:
+                    if hashes is None:
+                        hashes = [self.tx_hash(t) for t in block['transactions']]
+                    entry['proof'] = self.merkle_proof(hashes, position)
+                else:
+                    entry['block'] = block
+                found.append(entry)
+        return found, len(blocks)
+
+    def find_transaction(self, tx_hash):
+        """
+        Locate a confirmed transaction, newest blocks first.
+        Returns (height, position in block, block) or None.
+        """
+        blocks = self.chain
+        for height in range(len(blocks) - 1, -1, -1):
+            for position, tx in enumerate(blocks[height]['transactions']):
+                if self.tx_hash(tx) == tx_hash:
+                    return height, position, blocks[height]
+        return None
+
     @property
     def last_block(self):
-        return self.chain[-1] if self.chain else None
+        blocks = self.chain
+        return blocks[-1] if blocks else None
+
+    def tip_tag(self, blocks=None):
+        """
+        Entity tag for chain-derived responses: height plus tip hash
+        (of blocks, a snapshot of the chain, when the caller already holds one)
+        """
+        blocks = self.chain if blocks is None else blocks
+        return f"{len(blocks)}-{self.hash(blocks[-1])[:16]}" if blocks else "0"
+
+    @staticmethod
+    def valid_proof(last_proof, proof, difficulty=DIFFICULTY):
+        guess = f'{last_proof}{proof}'.encode()
+        return hashlib.sha256(guess).hexdigest()[:difficulty] == "0" * difficulty
 
     def proof_of_work(self, last_proof, difficulty=DIFFICULTY):
         """
@@ -132,15 +600,92 @@ class SAXVChain:
 
     def register_node(self, address):
         """
-        Add a new node's address (e.g. http://192.168.1.2:5001)
+        Add a new node's address (e.g. http://192.168.1.2:5001) to the address book;
+        it becomes an active peer right away while fewer than MAX_OUTBOUND are active
         """
         parsed = urlparse(address)
         if parsed.netloc:
-            self.nodes.add(parsed.geturl().split("://")[-1])
+            node = parsed.geturl().split("://")[-1]
         elif parsed.path:
             # accept addresses without scheme
-            self.nodes.add(parsed.path)
+            node = parsed.path
+        else:
+            return
+        self.learn_nodes([node])
+        with self.write_lock:
+            if len(self.nodes) < MAX_OUTBOUND:
+                self.nodes = self.nodes | {node}
+        self._save_chain()
+
+    def learn_nodes(self, nodes):
+        """
+        Record peer addresses in the address book, evicting the longest unseen
+        once it holds more than ADDRESS_BOOK_SIZE
+        """
+        now = time.time()
+        with self.write_lock:
+            book = dict(self.address_book)
+            for node in nodes:
+                if isinstance(node, str) and node and node not in self.self_addresses:
+                    book[node] = now
+            while len(book) > ADDRESS_BOOK_SIZE:
+                del book[min(book, key=book.get)]
+            self.address_book = book
+
+    def known_peers(self, limit=PEER_EXCHANGE_COUNT):
+        """
+        Addresses to hand out to other nodes: active peers first, then the most recently seen
+        """
+        book, active = self.address_book, self.nodes
+        recent = sorted(book, key=book.get, reverse=True)
+        return (sorted(active) + [n for n in recent if n not in active])[:limit]
+
+    def _probe_status(self, node):
+        """
+        Time GET /status on an address-book entry; False if unreachable or ourselves
+        """
+        started = time.time()
+        try:
+            r = session.get(f'http://{node}/status', timeout=TIMEOUTS['probe'])
+            r.raise_for_status()
+            if r.json().get('node_id') == self.node_id:
+                with self.write_lock:
+                    self.self_addresses = self.self_addresses | {node}
+                    self.address_book = {n: t for n, t in self.address_book.items() if n != node}
+                return False
+            self.peers.record_success(node, time.time() - started)
+            return True
+        except Exception:
+            self.peers.record_failure(node)
+            return False
+
+    def _fetch_peer_list(self, node):
+        try:
+            r = session.get(f'http://{node}/nodes/peers', params={'port': self.public_port}, timeout=TIMEOUTS['probe'])
+            r.raise_for_status()
+            return r.json().get('peers', [])[:PEER_EXCHANGE_COUNT]
+        except Exception:
+            return []
+
+    def discover_peers(self):
+        """
+        Swap peer lists with the active peers, probe up to MAX_OUTBOUND address-book
+        entries and keep the MAX_OUTBOUND fastest reachable peers active. The cost of
+        a round depends on MAX_OUTBOUND, not on how many nodes the network has.
+        Active peers in a failure backoff are ranked last rather than dropped.
+        """
+        active = list(self.nodes)
+        for peers in self.discoverer.map(self._fetch_peer_list, active):
+            self.learn_nodes(peers)
+        spare = [n for n in self.peers.ranked(list(self.address_book)) if n not in active]
+        candidates = random.sample(spare, min(MAX_OUTBOUND, len(spare)))
+        reachable = [n for n, ok in zip(candidates, self.discoverer.map(self._probe_status, candidates)) if ok]
+        ranked = self.peers.ranked(set(active) | set(reachable)) + self.peers.backed_off(active)
+        with self.write_lock:
+            # nothing usable found (e.g. only quarantined peers left): keep what we had
+            self.nodes = set(ranked[:MAX_OUTBOUND]) or set(active)
         self._save_chain()
+        return sorted(self.nodes)
 
     def valid_chain(self, chain):
         """
@@ -151,102 +696,1146 @@ class SAXVChain:
 
         while current_index < len(chain):
             block = chain[current_index]
+            # the header hash only covers transactions through the merkle root
+            if 'merkle_root' in block:
+                hashes = [self.tx_hash(tx) for tx in block['transactions']]
+                # odd levels repeat their last hash, so [a, b, c] and [a, b, c, c] share a
+                # root (CVE-2012-2459): a block listing a transaction twice is never valid
+                if len(set(hashes)) != len(hashes) or block['merkle_root'] != self.merkle_root(hashes):
+                    return False
             # check previous hash
             if block['previous_hash'] != self.hash(last_block):
                 return False
             # check proof of work
-            last_proof = last_block['proof']
-            proof = block['proof']
-            guess = f'{last_proof}{proof}'.encode()
-            guess_hash = hashlib.sha256(guess).hexdigest()
-            if guess_hash[:DIFFICULTY] != "0" * DIFFICULTY:
+            if not self.valid_proof(last_block['proof'], block['proof']):
                 return False
             last_block = block
             current_index += 1
         return True
 
+    def find_fork_point(self, node, peer_length):
+        """
+        Binary search for the highest height (list position) where our chain
+        and the peer's chain hold the same block hash.
+        Returns -1 when not even the genesis block is shared.
+        """
+        blocks = self.chain
+        lo, hi = 0, min(len(blocks), peer_length) - 1
+        fork = -1
+        # common case first: the peer simply extends our tip
+        probe = hi
+        while lo <= hi:
+            r = session.get(f'http://{node}/hash/{probe}', timeout=TIMEOUTS['probe'])
+            r.raise_for_status()
+            if r.json().get('hash') == self.hash(blocks[probe]):
+                fork = probe
+                lo = probe + 1
+            else:
+                hi = probe - 1
+            probe = (lo + hi) // 2
+        return fork
+
+    @staticmethod
+    def fetch_range(node, kind, start, end):
+        """
+        Page through GET /headers or /blocks on a peer for heights [start, end)
+        """
+        items = []
+        while start + len(items) < end:
+            count = min(MAX_RANGE, end - start - len(items))
+            r = session.get(f'http://{node}/{kind}', params={'from': start + len(items), 'count': count},
+                            timeout=TIMEOUTS['download'])
+            r.raise_for_status()
+            page = r.json().get(kind)
+            if not page:
+                break
+            items.extend(page)
+        return items
+
+    def _probe_peer(self, node, min_length):
+        """
+        Headers-first probe of one peer: compare the peer's header at our tip
+        height with our tip and locate the common ancestor.
+        An up-to-date peer costs a single one-header response.
+        Returns (length, fork, node, tip tag) for a peer longer than min_length, else None;
+        the tip tag is the peer's ETag (height plus tip hash), None if it sent none.
+        """
+        try:
+            blocks = self.chain
+            tip = len(blocks) - 1
+            # a peer that was not ahead of us and has not moved since answers 304
+            tag, seen_length = self.peer_tags.get(node, (None, 0))
+            conditional = {'If-None-Match': tag} if tag and seen_length <= min_length else {}
+            started = time.time()
+            r = session.get(f'http://{node}/headers', params={'from': tip, 'count': 1},
+                            headers=conditional, timeout=TIMEOUTS['probe'])
+            if r.status_code not in (200, 304):
+                self.peers.record_failure(node)
+                return None
+            self.peers.record_success(node, time.time() - started)
+            if r.status_code == 304:
+                return None
+            data = r.json()
+            length = data.get('length')
+            tip_tag = r.headers.get('ETag')
+            self.peer_tags[node] = (tip_tag, length or 0)
+            if not length or length <= min_length:
+                return None
+            headers = data.get('headers')
+            if headers and self.header_hash(headers[0]) == self.hash(blocks[tip]):
+                fork = tip
+            else:
+                # diverged below our tip: binary search the heights under it
+                fork = self.find_fork_point(node, tip)
+            return length, fork, node, tip_tag
+        except Exception:
+            # network error or node offline — back off before asking again
+            self.peers.record_failure(node)
+            return None
+
+    def download_blocks(self, fork, end, sources):
+        """
+        Fetch the blocks at heights (fork, end) in MAX_RANGE chunks from several peers
+        in parallel, retrying a failed or invalid chunk on the next peer.
+        Chunks are validated in height order as they arrive; once the new branch is
+        longer than ours it is spliced in and every further chunk is persisted.
+        The download stops early if our chain moved off the branch meanwhile.
+        Returns True if our chain changed.
+        """
+        base = fork + 1
+        starts = list(range(base, end, MAX_RANGE))
+        if not starts:
+            return False
+        last = self.chain[fork] if fork >= 0 else None
+        anchor = last  # the common ancestor the branch hangs off
+        staged = []  # validated blocks not spliced in yet
+        spliced = False
+        ready = {}  # start -> (blocks, node)
+        attempts = {}
+        pending = {}  # future -> (start, node)
+        next_start = base
+        pool = ThreadPoolExecutor(max_workers=min(PEER_WORKERS, len(starts)))
+
+        def submit(start):
+            tries = attempts.get(start, 0)
+            if tries >= len(sources):
+                return False
+            attempts[start] = tries + 1
+            # spread chunks over peers, moving to the next peer on each retry
+            node = sources[((start - base) // MAX_RANGE + tries) % len(sources)]
+            count = min(MAX_RANGE, end - start)
+            pending[pool.submit(self.fetch_range, node, 'blocks', start, start + count)] = (start, node)
+            return True
+
+        try:
+            for start in starts:
+                submit(start)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, node = pending.pop(future)
+                    try:
+                        blocks = future.result()
+                    except Exception:
+                        blocks = None
+                    if blocks and len(blocks) == min(MAX_RANGE, end - start):
+                        ready[start] = (blocks, node)
+                    else:
+                        self.peers.record_failure(node)
+                        if not submit(start):
+                            return spliced
+                while next_start in ready:
+                    blocks, node = ready.pop(next_start)
+                    if not self.valid_chain([last] + blocks if last else blocks):
+                        self.peers.record_invalid(node)
+                        if not submit(next_start):
+                            return spliced
+                        break
+                    previous, last = last, blocks[-1]
+                    next_start += len(blocks)
+                    self.drop_confirmed(blocks)
+                    with self.write_lock:
+                        current = self.chain
+                        if spliced:
+                            # a block mined or announced meanwhile took the tip: next round resolves it
+                            if current[-1] is not previous:
+                                return spliced
+                            self.chain = current + tuple(blocks)
+                        else:
+                            staged.extend(blocks)
+                            if base + len(staged) <= len(current):
+                                continue
+                            if fork >= len(current) or (anchor is not None and current[fork] is not anchor):
+                                return spliced
+                            self.chain = current[:base] + tuple(staged)
+                            staged = []
+                            spliced = True
+                        self._save_chain()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return spliced
+
     def resolve_conflicts(self):
         """
-        Consensus Algorithm: resolve by replacing our chain with the longest valid one in the network
+        Run one consensus round, waiting for a round already in progress to finish first.
+        Returns True if our chain changed.
+        """
+        with self.sync_lock:
+            changed = self._consensus_round()
+            self.tip_checked = time.time()
+            return changed
+
+    def _consensus_round(self):
+        """
+        Consensus Algorithm: resolve by adopting the longest valid chain in the network.
+        Peers are probed concurrently under one round deadline; the blocks after the
+        common ancestor are then downloaded in parallel from every peer that has them.
+        Backed-off and quarantined peers are skipped; faster peers are asked first.
+        """
+        neighbours = self.peers.ranked(self.nodes)
+        if not neighbours:
+            return False
+        candidates = []
+
+        futures = [self.prober.submit(self._probe_peer, node, len(self.chain)) for node in neighbours]
+        try:
+            for future in as_completed(futures, timeout=ROUND_DEADLINE):
+                result = future.result()
+                if result:
+                    candidates.append(result)
+        except FuturesTimeout:
+            # keep whatever arrived before the deadline
+            pass
+        finally:
+            # peers not probed yet are skipped this round
+            for future in futures:
+                future.cancel()
+
+        # longest first, fastest among equals; fall back to the next one if a chain turns out invalid
+        candidates.sort(key=lambda c: (-c[0], self.peers.latency(c[2])))
+        for length, fork, node, tip_tag in candidates:
+            if length <= len(self.chain):
+                break
+            # only peers on the very same tip serve chunks of this branch; a peer on a
+            # competing fork would fail validation and be quarantined for being honest
+            sources = [node] + [n for _, _, n, t in candidates if n != node and tip_tag and t == tip_tag]
+            if self.download_blocks(fork, length, sources):
+                return True
+        return False
+
+    def announce_block(self, block):
+        """
+        Push hash + height of a new block to every peer; they pull the block itself
+        """
+        message = {'hash': self.hash(block), 'height': block['index'] - 1, 'port': self.public_port}
+        for node in self.peers.ranked(self.nodes):
+            link = self.link(node)
+            if link:
+                link.post(MSG_INV, {'blocks': [[message['hash'], message['height']]]})
+            else:
+                self.announcer.submit(self._post_announcement, node, message)
+
+    def link(self, node):
+        """
+        Open TCP peer link to node, or None to use HTTP
+        """
+        return self.p2p.links.get(node) if self.p2p else None
+
+    def _post_announcement(self, node, message):
+        try:
+            session.post(f'http://{node}/blocks/announce', json=message, timeout=TIMEOUTS['probe'])
+        except Exception:
+            self.peers.record_failure(node)
+
+    def receive_announcement(self, source, block_hash, height, link=None):
+        """
+        Append an announced block when it extends our tip and relay it on;
+        fall back to full consensus when we are behind or on another branch.
+        The block is pulled over link when the announcement came over one.
+        Returns True if our chain changed.
+        """
+        try:
+            if height < len(self.chain):
+                return False
+            if height > len(self.chain):
+                return self._resync()
+            block = self.fetch_compact_block(source, height, link)
+            if block is None:
+                # legacy block or short-id collision: fetch it whole
+                if link:
+                    blocks = link.call(MSG_GETBLOCKS, {'from': height, 'count': 1}).get('blocks')
+                else:
+                    r = session.get(f'http://{source}/blocks', params={'from': height, 'count': 1},
+                                    timeout=TIMEOUTS['probe'])
+                    blocks = r.json().get('blocks') if r.status_code == 200 else None
+                block = blocks[0] if blocks else None
+            with self.write_lock:
+                current = self.chain
+                if not block or self.hash(block) != block_hash or len(current) != height:
+                    return False
+                valid = self.valid_chain([current[-1], block])
+                if valid:
+                    self.chain = current + (block,)
+                    self.drop_confirmed([block])
+                    self._save_chain()
+            if not valid:
+                return self._resync()
+            self.announce_block(block)
+            return True
+        except Exception:
+            return False
+
+    def compact_block(self, height):
+        """
+        Header plus short tx ids of the block at height. Mining rewards cannot be
+        in any peer's mempool, so they are sent in full ('prefilled', by position).
+        """
+        block = self.chain[height]
+        compact = {name: block[name] for name in HEADER_FIELDS}
+        compact['short_ids'] = [self.tx_hash(tx)[:SHORT_ID_LEN] for tx in block['transactions']]
+        compact['prefilled'] = {str(i): tx for i, tx in enumerate(block['transactions'])
+                                if tx.get('sender') == "0"}
+        return compact
+
+    def fetch_compact_block(self, node, height, link=None):
+        """
+        Rebuild the block at height from its compact form and our mempool,
+        requesting only the transactions we do not have (over link if given).
+        Returns the block, or None if it has no compact form or does not rebuild.
+        """
+        if link:
+            compact = link.call(MSG_GETCOMPACT, {'height': height}).get('compact')
+        else:
+            r = session.get(f'http://{node}/blocks/{height}/compact', timeout=TIMEOUTS['probe'])
+            compact = r.json() if r.status_code == 200 else None
+        if not compact:
+            return None
+        with self.tx_lock:
+            mempool = {self.tx_hash(tx)[:SHORT_ID_LEN]: tx for tx in self.current_transactions}
+        prefilled = compact.get('prefilled', {})
+        txs = [prefilled.get(str(i)) or mempool.get(short_id)
+               for i, short_id in enumerate(compact['short_ids'])]
+        missing = [i for i, tx in enumerate(txs) if tx is None]
+        if missing:
+            if link:
+                fetched = link.call(MSG_GETBLOCKTXN, {'height': height, 'positions': missing}).get('transactions', [])
+            else:
+                r = session.get(f'http://{node}/blocks/{height}/txs', params={'i': missing},
+                                timeout=TIMEOUTS['probe'])
+                fetched = r.json().get('transactions', []) if r.status_code == 200 else []
+            if len(fetched) != len(missing):
+                return None
+            for i, tx in zip(missing, fetched):
+                txs[i] = tx
+        # a short-id collision shows up as a merkle root mismatch
+        if self.merkle_root([self.tx_hash(tx) for tx in txs]) != compact['merkle_root']:
+            return None
+        return {
+            'index': compact['index'],
+            'timestamp': compact['timestamp'],
+            'transactions': txs,
+            'merkle_root': compact['merkle_root'],
+            'proof': compact['proof'],
+            'previous_hash': compact['previous_hash']
+        }
+
+    def _resync(self):
+        # full consensus round; a changed tip is passed on like a freshly received block
+        if not self.resolve_conflicts():
+            return False
+        self.announce_block(self.last_block)
+        return True
+
+    def gossip_transactions(self):
+        """
+        Announce queued tx hashes to every peer, at most GOSSIP_BATCH per round.
+        Each peer answers with the hashes it is missing and only those are sent.
+        Returns the number of hashes announced.
+        """
+        with self.tx_lock:
+            batch, self.tx_inv = self.tx_inv[:GOSSIP_BATCH], self.tx_inv[GOSSIP_BATCH:]
+            mempool = {self.tx_hash(tx): tx for tx in self.current_transactions}
+        batch = [h for h in batch if h in mempool]
+        if batch:
+            for node in self.peers.ranked(self.nodes):
+                link = self.link(node)
+                if link:
+                    # the peer pulls what it misses with MSG_GETTX
+                    link.post(MSG_INV, {'txs': batch})
+                else:
+                    self.announcer.submit(self._send_inventory, node, batch, mempool)
+        return len(batch)
+
+    def _send_inventory(self, node, hashes, mempool):
+        try:
+            r = session.post(f'http://{node}/transactions/inv', json={'hashes': hashes},
+                             timeout=TIMEOUTS['probe'])
+            r.raise_for_status()
+            wanted = [mempool[h] for h in r.json().get('missing', []) if h in mempool]
+            if wanted:
+                session.post(f'http://{node}/transactions/relay', json={'transactions': wanted},
+                             timeout=TIMEOUTS['probe'])
+        except Exception:
+            self.peers.record_failure(node)
+
+class PeerLink:
+    """
+    One persistent TCP connection to a peer. Every frame is FRAME (payload length,
+    message type) followed by a compact JSON payload; requests carry an 'id'
+    that the MSG_REPLY frame answering them echoes back.
+    """
+    def __init__(self, p2p, reader, writer, dialer_id):
+        self.p2p = p2p
+        self.reader = reader
+        self.writer = writer
+        self.dialer_id = dialer_id  # node_id of the side that opened the connection
+        self.node = None  # peer's HTTP address host:port, known after the handshake
+        self.pending = {}  # request id -> future
+        self.next_id = 0
+
+    async def send(self, kind, payload):
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        self.writer.write(FRAME.pack(len(body), kind) + body)
+        await self.writer.drain()
+
+    async def read(self):
+        length, kind = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+        if length > MAX_FRAME:
+            raise ValueError(f"frame of {length} bytes")
+        return kind, json.loads(await self.reader.readexactly(length))
+
+    async def request(self, kind, payload):
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            await self.send(kind, dict(payload, id=request_id))
+            return await asyncio.wait_for(future, P2P_TIMEOUT)
+        finally:
+            self.pending.pop(request_id, None)
+
+    def call(self, kind, payload):
+        """
+        Blocking request/reply for worker threads (never call it on the event loop)
+        """
+        return asyncio.run_coroutine_threadsafe(self.request(kind, payload), self.p2p.loop).result(P2P_TIMEOUT + 1)
+
+    def post(self, kind, payload):
+        """
+        Fire-and-forget send from any thread
+        """
+        asyncio.run_coroutine_threadsafe(self.send(kind, payload), self.p2p.loop)
+
+class P2PNode:
+    """
+    TCP peer protocol next to the HTTP API: keeps one link per peer, answers block,
+    compact block and tx requests on the event loop, and hands inventory to the
+    chain's worker threads. Peers without a link keep using HTTP.
+    """
+    def __init__(self, chain, port):
+        self.chain = chain
+        self.port = port
+        self.links = {}  # node (HTTP host:port) -> PeerLink
+        self.dialing = set()
+        self.loop = asyncio.new_event_loop()
+
+    def start(self):
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._accept, '0.0.0.0', self.port), self.loop)
+        server.result()
+        asyncio.run_coroutine_threadsafe(self._maintain(), self.loop)
+
+    async def _accept(self, reader, writer):
+        await self._run(PeerLink(self, reader, writer, None), None)
+
+    async def _maintain(self):
+        while True:
+            for node in self.chain.peers.ranked(self.chain.nodes):
+                if node not in self.links and node not in self.dialing:
+                    self.dialing.add(node)
+                    asyncio.ensure_future(self._dial(node))
+            for link in list(self.links.values()):
+                asyncio.ensure_future(self._ping(link))
+            await asyncio.sleep(P2P_DIAL_INTERVAL)
+
+    @staticmethod
+    def _lookup_port(node):
+        # the peer advertises its TCP port in /status; None means it speaks HTTP only
+        return session.get(f'http://{node}/status', timeout=TIMEOUTS['probe']).json().get('p2p_port')
+
+    async def _dial(self, node):
+        try:
+            port = await self.loop.run_in_executor(self.chain.announcer, self._lookup_port, node)
+            if not port:
+                return
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(urlparse(f'//{node}').hostname, port), P2P_TIMEOUT)
+        except Exception:
+            return
+        finally:
+            self.dialing.discard(node)
+        await self._run(PeerLink(self, reader, writer, self.chain.node_id), node)
+
+    async def _ping(self, link):
+        started = time.time()
+        try:
+            await link.request(MSG_PING, {})
+            self.chain.peers.record_success(link.node, time.time() - started)
+        except Exception:
+            self.chain.peers.record_failure(link.node)
+            link.writer.close()
+
+    def _register(self, link):
+        """
+        Keep one link per peer. When both sides dialed each other, both keep the
+        connection opened by the smaller node_id.
+        """
+        current = self.links.get(link.node)
+        if current and current.dialer_id <= link.dialer_id:
+            return False
+        if current:
+            current.writer.close()
+        self.links[link.node] = link
+        return True
+
+    async def _run(self, link, node):
+        try:
+            await link.send(MSG_HANDSHAKE, {'node_id': self.chain.node_id, 'port': self.chain.public_port,
+                                            'height': len(self.chain.chain)})
+            kind, hello = await asyncio.wait_for(link.read(), P2P_TIMEOUT)
+            if kind != MSG_HANDSHAKE:
+                return
+            host = link.writer.get_extra_info('peername')[0]
+            link.node = node or f"{host}:{hello['port']}"
+            if link.dialer_id is None:
+                link.dialer_id = hello['node_id']
+            if not self._register(link):
+                return
+            self.chain.learn_nodes([link.node])
+            while True:
+                kind, message = await link.read()
+                self._dispatch(link, kind, message)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError,
+                ValueError, KeyError, TypeError, AttributeError):
+            pass
+        finally:
+            if link.node and self.links.get(link.node) is link:
+                del self.links[link.node]
+            for future in link.pending.values():
+                future.cancel()
+            link.writer.close()
+
+    def _dispatch(self, link, kind, message):
+        if kind == MSG_REPLY:
+            future = link.pending.get(message.get('id'))
+            if future and not future.done():
+                future.set_result(message)
+        elif kind == MSG_INV:
+            # may block on requests back to the peer, so it runs off the loop
+            self.chain.announcer.submit(self._handle_inv, link, message)
+        elif kind in (MSG_PING, MSG_GETBLOCKS, MSG_GETCOMPACT, MSG_GETBLOCKTXN, MSG_GETTX):
+            reply = self._answer(kind, message)
+            reply['id'] = message.get('id')
+            asyncio.ensure_future(self._reply(link, reply))
+
+    @staticmethod
+    async def _reply(link, reply):
+        try:
+            await link.send(MSG_REPLY, reply)
+        except ConnectionError:
+            pass
+
+    def _answer(self, kind, message):
+        blocks = self.chain.chain
+        if kind == MSG_GETBLOCKS:
+            start = max(0, message.get('from', 0))
+            count = min(max(0, message.get('count', MAX_RANGE)), MAX_RANGE)
+            return {'from': start, 'blocks': blocks[start:start + count], 'length': len(blocks)}
+        if kind in (MSG_GETCOMPACT, MSG_GETBLOCKTXN):
+            height = message.get('height', -1)
+            if height < 0 or height >= len(blocks) or 'merkle_root' not in blocks[height]:
+                return {}
+            if kind == MSG_GETCOMPACT:
+                return {'compact': self.chain.compact_block(height)}
+            txs = blocks[height]['transactions']
+            return {'transactions': [txs[i] for i in message.get('positions', []) if 0 <= i < len(txs)]}
+        if kind == MSG_GETTX:
+            with self.chain.tx_lock:
+                mempool = {self.chain.tx_hash(tx): tx for tx in self.chain.current_transactions}
+            return {'transactions': [mempool[h] for h in message.get('txs', [])[:GOSSIP_BATCH] if h in mempool]}
+        return {}
+
+    def _handle_inv(self, link, message):
+        try:
+            for block_hash, height in message.get('blocks', []):
+                self.chain.receive_announcement(link.node, block_hash, height, link)
+            missing = self.chain.missing_transactions(message.get('txs', []))
+            if missing:
+                self.chain.accept_relayed(link.call(MSG_GETTX, {'txs': missing}).get('transactions', []))
+        except Exception:
+            pass
+
+class LightClient:
+    """
+    Headers-only client for resource-limited phones.
+    Keeps block headers, checks their hash links and proof of work,
+    and pulls merkle proofs only for transactions touching watched addresses.
+    """
+    def __init__(self, peers, addresses, port):
+        self.peers = list(peers)
+        self.addresses = set(addresses)
+        self.headers = []
+        self.transactions = {}  # tx_hash -> {'transaction', 'height'}
+        self.scanned = {}  # address -> headers below this height already searched
+        self.filename = os.path.join(STORAGE_DIR, f"headers_{port}.json")
+        if os.path.exists(self.filename):
+            with open(self.filename, "r") as f:
+                data = json.load(f)
+                self.headers = data.get("headers", [])
+                self.transactions = data.get("transactions", {})
+                self.scanned = data.get("scanned", {})
+
+    def _save(self):
+        try:
+            with open(self.filename, "w") as f:
+                json.dump({"headers": self.headers, "transactions": self.transactions, "scanned": self.scanned}, f)
+        except Exception as e:
+            print("[save headers] failed:", e)
+
+    def valid_headers(self, headers, previous=None):
+        """
+        Check hash links and proof of work of headers, optionally anchored on previous
         """
-        neighbours = self.nodes.copy()
-        new_chain = None
-        max_length = len(self.chain)
+        for header in headers:
+            if 'merkle_root' not in header and 'hash' not in header:
+                return False
+            if previous is not None:
+                if header['previous_hash'] != SAXVChain.header_hash(previous):
+                    return False
+                if not SAXVChain.valid_proof(previous['proof'], header['proof']):
+                    return False
+            previous = header
+        return True
 
-        for node in neighbours:
-            url = f'http://{node}/chain'
+    def sync_headers(self):
+        """
+        Follow the longest valid header chain among peers
+        """
+        changed = False
+        for peer in self.peers:
             try:
-                r = requests.get(url, timeout=3)
-                if r.status_code == 200:
-                    data = r.json()
-                    length = data.get('length')
-                    chain = data.get('chain')
-                    if length and chain and length > max_length and self.valid_chain(chain):
-                        max_length = length
-                        new_chain = chain
+                r = session.get(f'http://{peer}/status', timeout=TIMEOUTS['probe'])
+                length = r.json().get('chain_length', 0) if r.status_code == 200 else 0
+                if length <= len(self.headers):
+                    continue
+                headers = SAXVChain.fetch_range(peer, 'headers', len(self.headers), length)
+                anchor = self.headers[-1] if self.headers else None
+                if not (headers and self.valid_headers(headers, anchor)):
+                    # peer is on another branch: headers are small, refetch them all
+                    headers = SAXVChain.fetch_range(peer, 'headers', 0, length)
+                    if len(headers) <= len(self.headers) or not self.valid_headers(headers):
+                        continue
+                    self.headers = headers
+                    # drop transactions whose blocks may have been reorganised away
+                    self.transactions = {}
+                    self.scanned = {}
+                else:
+                    self.headers.extend(headers)
+                changed = True
             except Exception:
-                # network error or node offline — ignore
                 pass
+        if changed:
+            self._save()
+        return changed
 
-        if new_chain:
-            self.chain = new_chain
-            self._save_chain()
-            return True
-        return False
+    def verify_entry(self, entry):
+        """
+        Check a /address/<address>/txs entry against our headers
+        """
+        height = entry.get('height')
+        if not isinstance(height, int) or not 0 <= height < len(self.headers):
+            return False
+        header = self.headers[height]
+        tx = entry['transaction']
+        if 'merkle_root' in header:
+            return SAXVChain.verify_merkle_proof(SAXVChain.tx_hash(tx), entry.get('proof', []),
+                                                 header['merkle_root'])
+        block = entry.get('block')
+        return bool(block) and SAXVChain.hash(block) == header['hash'] and tx in block['transactions']
+
+    def sync_transactions(self):
+        """
+        Fetch and verify transactions touching our watched addresses in blocks
+        not searched yet; transactions already verified are kept
+        """
+        changed = False
+        for address in self.addresses:
+            start = self.scanned.get(address, 0)
+            if start >= len(self.headers):
+                continue
+            for peer in self.peers:
+                try:
+                    r = session.get(f'http://{peer}/address/{address}/txs', params={'from': start},
+                                    timeout=TIMEOUTS['download'])
+                    if r.status_code != 200:
+                        continue
+                    data = r.json()
+                    # blocks past our headers cannot be verified yet: search them next time
+                    end = min(data.get('height', 0), len(self.headers))
+                    if end <= start:
+                        continue
+                    for entry in data.get('transactions', []):
+                        if entry.get('height', end) < end and self.verify_entry(entry):
+                            self.transactions[SAXVChain.tx_hash(entry['transaction'])] = {
+                                'transaction': entry['transaction'],
+                                'height': entry['height']
+                            }
+                    self.scanned[address] = end
+                    changed = True
+                    break
+                except Exception:
+                    pass
+        if changed:
+            self._save()
+
+    def balance(self, address):
+        total = 0
+        for item in self.transactions.values():
+            tx = item['transaction']
+            if tx.get('recipient') == address:
+                total += tx.get('amount', 0)
+            if tx.get('sender') == address:
+                total -= tx.get('amount', 0)
+        return total
+
+class SnapshotStore:
+    """
+    Chain snapshot shared with read-only worker processes through an mmap'd file,
+    plus a small JSON file with the /status answer.
+    The writer writes each snapshot to a temp file and renames it into place, so a
+    mapping always holds one complete snapshot; encodings of the blocks shared with
+    the previous snapshot are reused.
+    Layout: SNAPSHOT_HEAD (magic, count), count+1 block offsets, count+1 header
+    offsets, count 64-byte block hashes, then the block and header JSON regions.
+    Every entry ends in ',' so a range of them slices straight into a JSON array.
+    """
+    def __init__(self, port):
+        self.path = os.path.join(STORAGE_DIR, f"snapshot_{port}.bin")
+        self.status_path = os.path.join(STORAGE_DIR, f"status_{port}.json")
+        # writer side: chain tuple in the file and (block, header, hash) encodings of it
+        self.published = ()
+        self.encoded = []
+        # reader side: current mapping and status, keyed by file identity
+        self.view = None
+        self.view_stamp = None
+        self.status = None
+        self.status_stamp = None
+        self.lock = threading.Lock()
+
+    def publish(self, blocks):
+        """
+        Write blocks (a chain snapshot) unless it is the one already published
+        """
+        if blocks is self.published:
+            return False
+        keep = 0
+        while keep < min(len(blocks), len(self.published)) and blocks[keep] is self.published[keep]:
+            keep += 1
+        self.encoded = self.encoded[:keep] + [(
+            json.dumps(block).encode() + b',',
+            json.dumps(SAXVChain.header(block)).encode() + b',',
+            SAXVChain.hash(block).encode()
+        ) for block in blocks[keep:]]
+        block_offsets, header_offsets = array('Q', [0]), array('Q', [0])
+        for block_json, header_json, _ in self.encoded:
+            block_offsets.append(block_offsets[-1] + len(block_json))
+            header_offsets.append(header_offsets[-1] + len(header_json))
+        with open(self.path + '.tmp', 'wb') as f:
+            f.write(SNAPSHOT_HEAD.pack(SNAPSHOT_MAGIC, len(blocks)))
+            f.write(block_offsets.tobytes())
+            f.write(header_offsets.tobytes())
+            f.write(b''.join(block_hash for _, _, block_hash in self.encoded))
+            f.write(b''.join(block_json for block_json, _, _ in self.encoded))
+            f.write(b''.join(header_json for _, header_json, _ in self.encoded))
+        os.replace(self.path + '.tmp', self.path)
+        self.published = blocks
+        return True
+
+    def publish_status(self, tag, payload):
+        with open(self.status_path + '.tmp', 'w') as f:
+            json.dump({'tag': tag, 'status': payload}, f)
+        os.replace(self.status_path + '.tmp', self.status_path)
+
+    @staticmethod
+    def _stamp(path):
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def snapshot(self):
+        """
+        ChainView of the latest published snapshot (reader side)
+        """
+        stamp = self._stamp(self.path)
+        with self.lock:
+            if stamp != self.view_stamp:
+                with open(self.path, 'rb') as f:
+                    self.view = ChainView(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                self.view_stamp = stamp
+            return self.view
+
+    def current_status(self):
+        """
+        (tag, payload) of the latest published /status answer (reader side)
+        """
+        stamp = self._stamp(self.status_path)
+        with self.lock:
+            if stamp != self.status_stamp:
+                with open(self.status_path) as f:
+                    data = json.load(f)
+                self.status = (data['tag'], data['status'])
+                self.status_stamp = stamp
+            return self.status
+
+class ChainView:
+    """
+    One published chain snapshot, read straight from its mapping
+    """
+    def __init__(self, mapping):
+        self.mapping = mapping
+        magic, self.length = SNAPSHOT_HEAD.unpack_from(mapping)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a chain snapshot")
+        table = SNAPSHOT_HEAD.size
+        entries = 8 * (self.length + 1)
+        self.block_offsets = memoryview(mapping)[table:table + entries].cast('Q')
+        self.header_offsets = memoryview(mapping)[table + entries:table + 2 * entries].cast('Q')
+        self.hashes_at = table + 2 * entries
+        self.blocks_at = self.hashes_at + 64 * self.length
+        self.headers_at = self.blocks_at + self.block_offsets[-1]
+        self.chain_body = None  # full /chain body, built on first use
+
+    def hash(self, height):
+        at = self.hashes_at + 64 * height
+        return self.mapping[at:at + 64].decode()
+
+    def tip_tag(self):
+        return f"{self.length}-{self.hash(self.length - 1)[:16]}" if self.length else "0"
+
+    def _array(self, at, offsets, start, stop):
+        stop = min(stop, self.length)
+        if start >= stop:
+            return b'[]'
+        return b'[' + self.mapping[at + offsets[start]:at + offsets[stop] - 1] + b']'
+
+    def blocks(self, start, stop):
+        """
+        JSON array of the blocks at heights [start, stop)
+        """
+        return self._array(self.blocks_at, self.block_offsets, start, stop)
+
+    def headers(self, start, stop):
+        return self._array(self.headers_at, self.header_offsets, start, stop)
+
+    def block(self, height):
+        at = self.blocks_at
+        return self.mapping[at + self.block_offsets[height]:at + self.block_offsets[height + 1] - 1]
 
 # ---------------- Flask App ----------------
 app = Flask(__name__)
 node_identifier = str(uuid4()).replace('-', '')
 
-# parse port from args
-if len(sys.argv) >= 2:
-    try:
-        PORT = int(sys.argv[1])
-    except:
-        PORT = 5000
-else:
-    PORT = 5000
+# parse port and mode from args
+parser = argparse.ArgumentParser(description="SAXV Chain Mini v6 node")
+parser.add_argument('port', nargs='?', type=int, default=5000)
+parser.add_argument('--light', action='store_true', help="headers-only light client (no API server)")
+parser.add_argument('--peer', action='append', default=[], help="peer address host:port (light mode)")
+parser.add_argument('--watch', action='append', default=[], help="address to track (light mode)")
+parser.add_argument('--p2p-port', type=int, help=f"TCP peer port (default: port + {P2P_PORT_OFFSET})")
+parser.add_argument('--no-p2p', action='store_true', help="talk to peers over HTTP only")
+parser.add_argument('--advertise-port', type=int, help="HTTP port peers should use to reach this node (default: port)")
+parser.add_argument('--async-server', action='store_true',
+                    help="serve the API from an asyncio event loop (saxv_async_server.py) instead of app.run")
+parser.add_argument('--read-workers', type=int, default=0,
+                    help="serve reads from N worker processes sharing the port (Linux); this process "
+                         f"keeps the chain and takes writes on localhost, port + {WRITER_PORT_OFFSET}")
+parser.add_argument('--read-worker', action='store_true', help=argparse.SUPPRESS)
+args = parser.parse_args()
+PORT = args.port
 
-chain = SAXVChain(node_id=node_identifier, port=PORT)
+# a light client keeps headers only and a read worker maps the writer's snapshot,
+# so neither loads the full chain
+chain = None if args.light or args.read_worker else SAXVChain(node_id=node_identifier, port=PORT,
+                                                              public_port=args.advertise_port)
 
 @app.route('/mine', methods=['GET'])
 def mine():
-    # quick consensus before mining to avoid wasteful mining on an outdated chain
-    chain.resolve_conflicts()
-
-    last_block = chain.last_block
-    last_proof = last_block['proof'] if last_block else 0
-    proof = chain.proof_of_work(last_proof)
-
-    # reward for mining (sender "0" means new coin)
-    chain.new_transaction(sender="0", recipient=chain.node_id, amount=1)
+    # the tip tracker keeps our chain current in the background; ?sync=1 forces a round first
+    if request.args.get('sync'):
+        chain.resolve_conflicts()
 
-    previous_hash = chain.hash(last_block) if last_block else '1'
-    block = chain.new_block(proof, previous_hash)
+    while True:
+        last_block = chain.last_block
+        last_proof = last_block['proof'] if last_block else 0
+        proof = chain.proof_of_work(last_proof)
+        # a peer's block may have landed while we worked: mine on top of it instead.
+        # The tip check and the append are one write, so no block can slip in between.
+        with chain.write_lock:
+            if chain.last_block is last_block:
+                # reward for mining (sender "0" means new coin)
+                chain.new_transaction(sender="0", recipient=chain.node_id, amount=1)
+                previous_hash = chain.hash(last_block) if last_block else '1'
+                block = chain.new_block(proof, previous_hash)
+                break
+    chain.announce_block(block)
 
     response = {
         'message': "New Block Forged",
         'index': block['index'],
         'transactions': block['transactions'],
+        'merkle_root': block['merkle_root'],
         'proof': block['proof'],
-        'previous_hash': block['previous_hash']
+        'previous_hash': block['previous_hash'],
+        'tip_checked_ago': round(time.time() - chain.tip_checked, 3)
     }
     return jsonify(response), 200
 
+# per-client admission for /transactions/new, and a separate bulk budget for /transactions/batch
+tx_limiter = RateLimiter(CLIENT_TX_RATE, CLIENT_TX_BURST)
+bulk_limiter = RateLimiter(CLIENT_BULK_RATE, CLIENT_BULK_BURST)
+
+def _too_busy(message, wait):
+    """
+    429 telling the client how many seconds to wait before trying again
+    """
+    retry_after = max(1, int(-(-wait // 1)))
+    response = jsonify({'message': message, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
 @app.route('/transactions/new', methods=['POST'])
 def new_transaction():
     values = request.get_json(force=True)
     required = ['sender', 'recipient', 'amount']
     if not values or not all(k in values for k in required):
         return 'Missing values', 400
+    wait = tx_limiter.acquire(request.remote_addr)
+    if wait:
+        return _too_busy('Too many transactions from this client', wait)
     index = chain.new_transaction(values['sender'], values['recipient'], values['amount'])
+    if index is None:
+        return _too_busy('Mempool is full', chain.mempool_wait())
     return jsonify({'message': f'Transaction will be added to block {index}'}), 201
 
+@app.route('/transactions/batch', methods=['POST'])
+def new_transaction_batch():
+    """
+    Up to MAX_TX_SUBMIT transactions in one request: {'transactions': [...]}.
+    Every transaction costs one token of the client's bulk budget, which holds a
+    full batch; those beyond the client's tokens are answered 'rate_limited'.
+    MEMPOOL_LIMIT and 429 + Retry-After push back on everyone at once.
+    Answers one result per transaction, in order.
+    """
+    values = request.get_json(force=True)
+    txs = values.get('transactions') if isinstance(values, dict) else None
+    if not isinstance(txs, list):
+        return 'Missing values', 400
+    if len(txs) > MAX_TX_SUBMIT:
+        return jsonify({'message': f'At most {MAX_TX_SUBMIT} transactions per batch'}), 413
+    granted, wait = bulk_limiter.take(request.remote_addr, len(txs))
+    if txs and not granted:
+        return _too_busy('Too many transactions from this client', wait)
+    results = chain.new_transactions(txs[:granted]) + [{'status': 'rate_limited'} for _ in txs[granted:]]
+    accepted = sum(result['status'] == 'accepted' for result in results)
+    response = {'accepted': accepted, 'results': results}
+    if accepted:
+        response['block'] = chain.last_block['index'] + 1
+    if any(result['status'] == 'mempool_full' for result in results):
+        wait = max(wait, chain.mempool_wait())
+    if wait:
+        response['retry_after'] = max(1, int(-(-wait // 1)))
+    return jsonify(response), 200
+
+@app.route('/transactions/inv', methods=['POST'])
+def transaction_inventory():
+    values = request.get_json(force=True)
+    hashes = values.get('hashes') if values else None
+    if not isinstance(hashes, list):
+        return 'Missing values', 400
+    return jsonify({'missing': chain.missing_transactions(hashes)}), 200
+
+@app.route('/transactions/relay', methods=['POST'])
+def relay_transactions():
+    values = request.get_json(force=True)
+    txs = values.get('transactions') if values else None
+    if not isinstance(txs, list):
+        return 'Missing values', 400
+    return jsonify({'accepted': chain.accept_relayed(txs)}), 200
+
+def _not_modified(tag):
+    """
+    304 response when the client already holds the representation tagged tag
+    """
+    if tag in request.if_none_match:
+        response = app.response_class(status=304)
+        response.set_etag(tag)
+        return response
+    return None
+
+def _tagged(payload, tag):
+    response = jsonify(payload)
+    response.set_etag(tag)
+    return response
+
+# full /chain body, serialized once per tip: (tag, body)
+_chain_cache = (None, None)
+
+def _stream_blocks(blocks, start, stop):
+    # one block per line, serialized only as the socket takes it
+    for height in range(start, stop):
+        yield json.dumps(blocks[height]) + '\n'
+
 @app.route('/chain', methods=['GET'])
 def full_chain():
+    """
+    Whole chain by default; ?offset=&limit= for one page,
+    ?stream=1 for chunked NDJSON (one block per line, X-Chain-Length header)
+    """
+    global _chain_cache
+    blocks = chain.chain
+    tag = chain.tip_tag(blocks)
+    cached = _not_modified(tag)
+    if cached:
+        return cached
+    length = len(blocks)
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return 'Invalid offset/limit', 400
+    stop = length if limit is None else min(length, offset + limit)
+
+    if request.args.get('stream'):
+        response = app.response_class(_stream_blocks(blocks, offset, stop), mimetype='application/x-ndjson')
+        response.headers['X-Chain-Length'] = str(length)
+    elif 'offset' in request.args or 'limit' in request.args:
+        response = jsonify({'chain': blocks[offset:stop], 'length': length, 'offset': offset, 'limit': limit})
+    else:
+        cached_tag, body = _chain_cache
+        if cached_tag != tag:
+            body = json.dumps({'chain': blocks, 'length': length})
+            _chain_cache = (tag, body)
+        response = app.response_class(body, status=200, mimetype='application/json')
+    response.set_etag(tag)
+    return response
+
+@app.route('/hash/<int:height>', methods=['GET'])
+def block_hash(height):
+    blocks = chain.chain
+    if height < 0 or height >= len(blocks):
+        return jsonify({'message': 'Height out of range'}), 404
+    return jsonify({'height': height, 'hash': chain.hash(blocks[height])}), 200
+
+@app.route('/blocks/<int:height>/compact', methods=['GET'])
+def compact_block(height):
+    blocks = chain.chain
+    if height < 0 or height >= len(blocks):
+        return jsonify({'message': 'Height out of range'}), 404
+    if 'merkle_root' not in blocks[height]:
+        return jsonify({'message': 'Legacy block has no compact form'}), 409
+    return jsonify(chain.compact_block(height)), 200
+
+@app.route('/blocks/<int:height>/txs', methods=['GET'])
+def block_transactions(height):
+    blocks = chain.chain
+    if height < 0 or height >= len(blocks):
+        return jsonify({'message': 'Height out of range'}), 404
+    txs = blocks[height]['transactions']
+    positions = request.args.getlist('i', type=int)
+    if any(i < 0 or i >= len(txs) for i in positions):
+        return jsonify({'message': 'Transaction position out of range'}), 400
+    return jsonify({'transactions': [txs[i] for i in positions]}), 200
+
+def _range_args():
+    """
+    Parse ?from=H&count=N, capping count at MAX_RANGE
+    """
+    start = request.args.get('from', 0, type=int)
+    count = request.args.get('count', MAX_RANGE, type=int)
+    if start < 0 or count < 0:
+        return None
+    return start, min(count, MAX_RANGE)
+
+@app.route('/blocks', methods=['GET'])
+def blocks_from():
+    parsed = _range_args()
+    if parsed is None:
+        return 'Invalid range', 400
+    start, count = parsed
+    blocks = chain.chain
+    tag = chain.tip_tag(blocks)
+    cached = _not_modified(tag)
+    if cached:
+        return cached
+    return _tagged({
+        'from': start,
+        'blocks': blocks[start:start + count],
+        'length': len(blocks)
+    }, tag), 200
+
+@app.route('/headers', methods=['GET'])
+def headers_from():
+    parsed = _range_args()
+    if parsed is None:
+        return 'Invalid range', 400
+    start, count = parsed
+    blocks = chain.chain
+    tag = chain.tip_tag(blocks)
+    cached = _not_modified(tag)
+    if cached:
+        return cached
+    return _tagged({
+        'from': start,
+        'headers': [chain.header(b) for b in blocks[start:start + count]],
+        'length': len(blocks)
+    }, tag), 200
+
+# ?from=H skips blocks below height H; 'height' is where the next incremental query starts
+@app.route('/address/<address>/txs', methods=['GET'])
+def address_transactions(address):
+    found, height = chain.transactions_for(address, request.args.get('from', 0, type=int))
+    return jsonify({'address': address, 'transactions': found, 'height': height}), 200
+
+@app.route('/blocks/announce', methods=['POST'])
+def block_announcement():
+    values = request.get_json(force=True)
+    required = ['hash', 'height', 'port']
+    if not values or not all(k in values for k in required):
+        return 'Missing values', 400
+    # the announcer serves the block itself on the port it advertised
+    source = f"{request.remote_addr}:{values['port']}"
+    chain.learn_nodes([source])
+    chain.announcer.submit(chain.receive_announcement, source, values['hash'], values['height'])
+    return jsonify({'message': 'Announcement accepted'}), 202
+
+@app.route('/tx/<tx_hash>/proof', methods=['GET'])
+def tx_proof(tx_hash):
+    found = chain.find_transaction(tx_hash)
+    if found is None:
+        return jsonify({'message': 'Transaction not found in chain'}), 404
+    height, position, block = found
+    if 'merkle_root' not in block:
+        return jsonify({'message': 'Block predates merkle roots, fetch the full block',
+                        'height': height}), 409
+    hashes = [chain.tx_hash(tx) for tx in block['transactions']]
     return jsonify({
-        'chain': chain.chain,
-        'length': len(chain.chain)
+        'tx_hash': tx_hash,
+        'transaction': block['transactions'][position],
+        'height': height,
+        'block_hash': chain.hash(block),
+        'merkle_root': block['merkle_root'],
+        'proof': chain.merkle_proof(hashes, position)
     }), 200
 
 @app.route('/nodes/register', methods=['POST'])
@@ -267,18 +1856,45 @@ def consensus():
     else:
         return jsonify({'message': 'Our chain is authoritative', 'chain': chain.chain}), 200
 
-@app.route('/status', methods=['GET'])
-def status():
-    return jsonify({
+@app.route('/nodes/peers', methods=['GET'])
+def peer_list():
+    # ?port= lets the asking node put itself in our address book as well
+    port = request.args.get('port', type=int)
+    if port:
+        chain.learn_nodes([f"{request.remote_addr}:{port}"])
+    return jsonify({'peers': chain.known_peers(), 'known': len(chain.address_book)}), 200
+
+@app.route('/nodes/health', methods=['GET'])
+def peer_health():
+    return jsonify({'peers': chain.peers.snapshot(), 'now': time.time()}), 200
+
+def status_snapshot():
+    """
+    (tag, payload) of /status; peers and mempool size go into the tag too
+    """
+    peers = sorted(chain.nodes)
+    blocks, mempool = chain.chain, chain.current_transactions
+    tag = f"{chain.tip_tag(blocks)}-{len(mempool)}-{zlib.crc32(' '.join(peers).encode()):x}"
+    return tag, {
         'node_id': chain.node_id,
         'port': chain.port,
-        'peers': list(chain.nodes),
-        'chain_length': len(chain.chain),
-        'pending_txs': len(chain.current_transactions)
-    }), 200
+        'peers': peers,
+        'chain_length': len(blocks),
+        'pending_txs': len(mempool),
+        'p2p_port': chain.p2p.port if chain.p2p else None
+    }
 
-# Lightweight background consensus ticker (optional)
-def periodic_consensus(interval=30):
+@app.route('/status', methods=['GET'])
+def status():
+    tag, payload = status_snapshot()
+    cached = _not_modified(tag)
+    if cached:
+        return cached
+    return _tagged(payload, tag), 200
+
+# Background tip tracker: cheap conditional probes while peers have nothing new,
+# so /mine never waits on the network
+def track_tip(interval=TIP_INTERVAL):
     while True:
         try:
             changed = chain.resolve_conflicts()
@@ -288,13 +1904,200 @@ def periodic_consensus(interval=30):
             pass
         time.sleep(interval)
 
+def periodic_gossip(interval=GOSSIP_INTERVAL):
+    while True:
+        try:
+            chain.gossip_transactions()
+        except Exception:
+            pass
+        time.sleep(interval)
+
+def periodic_discovery(interval=DISCOVERY_INTERVAL):
+    while True:
+        time.sleep(interval)
+        try:
+            chain.discover_peers()
+        except Exception:
+            pass
+
+def periodic_flush(interval=FLUSH_INTERVAL):
+    while True:
+        time.sleep(interval)
+        try:
+            chain.flush()
+        except Exception:
+            pass
+
+def publish_snapshots(store, interval=SNAPSHOT_INTERVAL):
+    # writer side of --read-workers: keep the shared snapshot and /status answer current
+    published_tag = None
+    while True:
+        try:
+            store.publish(chain.chain)
+            tag, payload = status_snapshot()
+            if tag != published_tag:
+                store.publish_status(tag, payload)
+                published_tag = tag
+        except Exception as e:
+            print("[publish snapshot] failed:", e)
+        time.sleep(interval)
+
+def start_read_workers(count):
+    """
+    Publish the first snapshot and start count read worker processes on PORT.
+    Returns the port the writer (this process) should serve on.
+    """
+    store = SnapshotStore(PORT)
+    store.publish(chain.chain)
+    store.publish_status(*status_snapshot())
+    threading.Thread(target=publish_snapshots, args=(store,), daemon=True).start()
+    writer_port = PORT + WRITER_PORT_OFFSET
+    command = [sys.executable, os.path.abspath(sys.argv[0]), str(PORT), '--read-worker']
+    workers = [subprocess.Popen(command) for _ in range(count)]
+    atexit.register(lambda: [worker.terminate() for worker in workers])
+    # workers forward writes here with the client address in X-Forwarded-For;
+    # the writer only listens on localhost, so that header can be trusted
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+    return writer_port
+
+def run_read_worker():
+    """
+    Read-only API worker: chain queries and /status come from the writer's shared
+    snapshot, every other request is forwarded to the writer.
+    """
+    from saxv_async_server import serve
+    store = SnapshotStore(PORT)
+    writer = f"http://127.0.0.1:{PORT + WRITER_PORT_OFFSET}"
+    reader = Flask(f"{__name__}_reader")
+
+    def raw(body, tag):
+        response = reader.response_class(body, status=200, mimetype='application/json')
+        response.set_etag(tag)
+        return response
+
+    @reader.route('/chain', methods=['GET'])
+    def worker_chain():
+        view = store.snapshot()
+        tag = view.tip_tag()
+        cached = _not_modified(tag)
+        if cached:
+            return cached
+        offset = request.args.get('offset', 0, type=int)
+        limit = request.args.get('limit', type=int)
+        if offset < 0 or (limit is not None and limit < 0):
+            return 'Invalid offset/limit', 400
+        stop = view.length if limit is None else min(view.length, offset + limit)
+        if request.args.get('stream'):
+            lines = (view.block(height) + b'\n' for height in range(offset, stop))
+            response = reader.response_class(lines, mimetype='application/x-ndjson')
+            response.headers['X-Chain-Length'] = str(view.length)
+            response.set_etag(tag)
+            return response
+        if 'offset' in request.args or 'limit' in request.args:
+            return raw(b'{"chain": %s, "length": %d, "offset": %d, "limit": %s}' % (
+                view.blocks(offset, stop), view.length, offset, json.dumps(limit).encode()), tag)
+        if view.chain_body is None:
+            view.chain_body = b'{"chain": %s, "length": %d}' % (view.blocks(0, view.length), view.length)
+        return raw(view.chain_body, tag)
+
+    @reader.route('/blocks', methods=['GET'])
+    @reader.route('/headers', methods=['GET'])
+    def worker_range():
+        parsed = _range_args()
+        if parsed is None:
+            return 'Invalid range', 400
+        start, count = parsed
+        view = store.snapshot()
+        tag = view.tip_tag()
+        cached = _not_modified(tag)
+        if cached:
+            return cached
+        kind = request.path.strip('/')
+        items = (view.blocks if kind == 'blocks' else view.headers)(start, start + count)
+        return raw(b'{"from": %d, "%s": %s, "length": %d}' % (start, kind.encode(), items, view.length), tag)
+
+    @reader.route('/hash/<int:height>', methods=['GET'])
+    def worker_hash(height):
+        view = store.snapshot()
+        if height < 0 or height >= view.length:
+            return jsonify({'message': 'Height out of range'}), 404
+        return jsonify({'height': height, 'hash': view.hash(height)}), 200
+
+    @reader.route('/status', methods=['GET'])
+    def worker_status():
+        tag, payload = store.current_status()
+        cached = _not_modified(tag)
+        if cached:
+            return cached
+        return _tagged(payload, tag), 200
+
+    @reader.route('/', defaults={'path': ''}, methods=['GET', 'POST', 'PUT', 'DELETE'])
+    @reader.route('/<path:path>', methods=['GET', 'POST', 'PUT', 'DELETE'])
+    def forward(path):
+        headers = {name: value for name, value in request.headers if name.lower() not in HOP_HEADERS}
+        headers['X-Forwarded-For'] = request.remote_addr
+        try:
+            r = session.request(request.method, writer + request.full_path.rstrip('?'), headers=headers,
+                                data=request.get_data(), stream=True, timeout=TIMEOUTS['forward'])
+        except requests.RequestException:
+            return jsonify({'message': 'Writer process unreachable'}), 503
+        passed = [(name, value) for name, value in r.headers.items() if name.lower() not in HOP_HEADERS]
+        return reader.response_class(r.raw.stream(64 * 1024, decode_content=False), status=r.status_code,
+                                     headers=passed)
+
+    def watch_writer(writer_pid):
+        # the writer may be killed without running its atexit hooks: go down with it
+        while os.getppid() == writer_pid:
+            time.sleep(1)
+        os._exit(0)
+
+    threading.Thread(target=watch_writer, args=(os.getppid(),), daemon=True).start()
+    print(f"[node {PORT}] Read worker {os.getpid()} serving the shared snapshot")
+    serve(reader, port=PORT, reuse_port=True)
+
+def run_light_client(interval=20):
+    client = LightClient(args.peer, args.watch, PORT)
+    print(f"Starting SAXV Chain Mini v6 light client (peers={client.peers})")
+    while True:
+        if client.sync_headers():
+            print(f"[light {PORT}] Synced headers (len={len(client.headers)})")
+        client.sync_transactions()
+        for address in client.addresses:
+            print(f"[light {PORT}] {address}: balance {client.balance(address)}")
+        time.sleep(interval)
+
 if __name__ == '__main__':
+    if args.light:
+        run_light_client()
+        sys.exit(0)
+    if args.read_worker:
+        run_read_worker()
+        sys.exit(0)
+
     # start background thread only if not on extremely constrained env
     try:
-        t = threading.Thread(target=periodic_consensus, args=(20,), daemon=True)
+        t = threading.Thread(target=track_tip, daemon=True)
         t.start()
+        threading.Thread(target=periodic_gossip, daemon=True).start()
+        threading.Thread(target=periodic_discovery, daemon=True).start()
+        threading.Thread(target=periodic_flush, daemon=True).start()
     except Exception:
         pass
 
+    if not args.no_p2p:
+        chain.p2p = P2PNode(chain, args.p2p_port or PORT + P2P_PORT_OFFSET)
+        chain.p2p.start()
+        print(f"[node {PORT}] Peer protocol on TCP port {chain.p2p.port}")
+
+    host, port = '0.0.0.0', PORT
+    if args.read_workers:
+        host, port = '127.0.0.1', start_read_workers(args.read_workers)
+        print(f"[node {PORT}] {args.read_workers} read workers on port {PORT}, writer on {host}:{port}")
+
     print(f"Starting SAXV Chain Mini v6 on port {PORT} (DIFFICULTY={DIFFICULTY})")
-    app.run(host='0.0.0.0', port=PORT)
\ No newline at end of file
+    if args.async_server:
+        from saxv_async_server import serve
+        # proof of work and consensus rounds get their own workers, away from light reads
+        serve(app, host=host, port=port, slow_paths=('/mine', '/nodes/resolve'))
+    else:
+        app.run(host=host, port=port)
\ No newline at end of file
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+saxv_chain_mini_v6_cluster_sim.py
+Local cluster simulator for SAXV Chain Mini v6
+- Starts N real v6 nodes as subprocesses on loopback ports (one data dir each)
+- Puts a TCP proxy in front of every node that adds latency/jitter and drops
+  connections with a given probability; peers only know each other's proxy
+- Scripts mining and transaction load, samples every node's tip directly
+- Reports propagation delay, convergence time, orphan rate and throughput as JSON
+
+Example:
+    python saxv_chain_mini_v6_cluster_sim.py --nodes 5 --duration 60 --latency 50 --loss 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import requests
+except Exception as e:
+    print("ERROR: requests not found. Install with: pip install requests")
+    raise
+
+NODE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saxv_chain_mini_v6.py")
+SAMPLE_INTERVAL = 0.05  # seconds between tip samples of every node
+STARTUP_TIMEOUT = 15  # seconds to wait for a node's HTTP API
+CONVERGE_TIMEOUT = 60  # seconds to wait for all nodes to agree after the load stops
+
+# ---------------------------
+# Latency / loss proxy
+# ---------------------------
+class LossyProxy:
+    """
+    Forwards loopback TCP connections listen_port -> target_port. Every chunk is
+    held back latency +/- jitter ms; with probability loss a chunk is dropped by
+    resetting the connection, which the node sees as a failed request.
+    """
+    def __init__(self, latency_ms, jitter_ms, loss):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.loss = loss
+        self.loop = asyncio.new_event_loop()
+        self.dropped = 0
+
+    def start(self, routes):
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        for listen_port, target_port in routes.items():
+            asyncio.run_coroutine_threadsafe(self._listen(listen_port, target_port), self.loop).result()
+
+    async def _listen(self, listen_port, target_port):
+        async def accept(reader, writer):
+            try:
+                upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', target_port)
+            except OSError:
+                writer.close()
+                return
+            await asyncio.gather(self._pipe(reader, upstream_writer), self._pipe(upstream_reader, writer))
+        await asyncio.start_server(accept, '127.0.0.1', listen_port)
+
+    async def _pipe(self, reader, writer):
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                if random.random() < self.loss:
+                    self.dropped += 1
+                    break
+                await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+                writer.write(chunk)
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+# ---------------------------
+# Cluster
+# ---------------------------
+class Cluster:
+    def __init__(self, n, base_port, p2p, workdir):
+        self.ports = [base_port + i for i in range(n)]
+        # peers are told about the proxy in front of a node, never the node itself
+        self.proxy_ports = {port: port + 100 for port in self.ports}
+        self.p2p = p2p
+        self.workdir = workdir
+        self.procs = []
+        self.session = requests.Session()
+
+    def url(self, port, path):
+        return f"http://127.0.0.1:{port}{path}"
+
+    def start(self):
+        for port in self.ports:
+            data_dir = os.path.join(self.workdir, f"node_{port}")
+            os.makedirs(data_dir, exist_ok=True)
+            cmd = [sys.executable, NODE_SCRIPT, str(port), '--advertise-port', str(self.proxy_ports[port])]
+            if not self.p2p:
+                cmd.append('--no-p2p')
+            log = open(os.path.join(data_dir, "node.log"), "w")
+            self.procs.append(subprocess.Popen(cmd, cwd=data_dir, stdout=log, stderr=subprocess.STDOUT))
+        deadline = time.time() + STARTUP_TIMEOUT
+        for port in self.ports:
+            while True:
+                try:
+                    self.session.get(self.url(port, '/status'), timeout=1)
+                    break
+                except requests.exceptions.RequestException:
+                    if time.time() > deadline:
+                        raise RuntimeError(f"node on port {port} did not start")
+                    time.sleep(0.1)
+
+    def stop(self):
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def connect(self, topology):
+        n = len(self.ports)
+        for i, port in enumerate(self.ports):
+            if topology == 'full':
+                peers = [j for j in range(n) if j != i]
+            elif topology == 'ring':
+                peers = sorted({(i - 1) % n, (i + 1) % n} - {i})
+            else:  # star around the first node
+                peers = [j for j in range(1, n)] if i == 0 else [0]
+            nodes = [f"127.0.0.1:{self.proxy_ports[self.ports[j]]}" for j in peers]
+            self.session.post(self.url(port, '/nodes/register'), json={'nodes': nodes}, timeout=5)
+
+    def tip(self, port):
+        length = self.session.get(self.url(port, '/status'), timeout=2).json()['chain_length']
+        block_hash = self.session.get(self.url(port, f'/hash/{length - 1}'), timeout=2).json()['hash']
+        return length, block_hash
+
+    def tips(self):
+        result = {}
+        for port in self.ports:
+            try:
+                result[port] = self.tip(port)
+            except (requests.exceptions.RequestException, KeyError, ValueError):
+                result[port] = None
+        return result
+
+    def converged(self):
+        tips = self.tips()
+        return None not in tips.values() and len(set(tips.values())) == 1
+
+    def wait_converged(self, timeout, nudge_every=5):
+        """
+        Seconds until every node reports the same tip, or None on timeout.
+        Nodes are asked to run consensus every nudge_every seconds meanwhile.
+        """
+        started = time.time()
+        last_nudge = started
+        while time.time() - started < timeout:
+            if self.converged():
+                return time.time() - started
+            if time.time() - last_nudge >= nudge_every:
+                last_nudge = time.time()
+                for port in self.ports:
+                    try:
+                        self.session.get(self.url(port, '/nodes/resolve'), timeout=10)
+                    except requests.exceptions.RequestException:
+                        pass
+            time.sleep(SAMPLE_INTERVAL)
+        return None
+
+# ---------------------------
+# Load + measurement
+# ---------------------------
+class Recorder:
+    """
+    Samples every node's chain and remembers when each (height, hash) first
+    appeared on each node
+    """
+    def __init__(self, cluster):
+        self.cluster = cluster
+        self.first_seen = {}  # (height, hash) -> {port: time}
+        self.known_length = {port: 0 for port in cluster.ports}
+        self.stop = threading.Event()
+        self.session = requests.Session()
+
+    def run(self):
+        while not self.stop.is_set():
+            for port in self.cluster.ports:
+                try:
+                    self._sample(port)
+                except (requests.exceptions.RequestException, KeyError, ValueError):
+                    pass
+            time.sleep(SAMPLE_INTERVAL)
+
+    def _sample(self, port):
+        now = time.time()
+        length = self.session.get(self.cluster.url(port, '/status'), timeout=2).json()['chain_length']
+        # re-check the last known height too, in case the node switched branches
+        for height in range(max(0, self.known_length[port] - 1), length):
+            block_hash = self.session.get(self.cluster.url(port, f'/hash/{height}'), timeout=2).json()['hash']
+            self.first_seen.setdefault((height, block_hash), {}).setdefault(port, now)
+        self.known_length[port] = length
+
+def mine_loop(cluster, interval, stop, mined, lock):
+    session = requests.Session()
+    threads = []
+
+    def mine_on(port):
+        try:
+            r = session.get(cluster.url(port, '/mine'), timeout=60)
+            block = r.json()
+            height = block['index'] - 1
+            mined_at = time.time()
+            block_hash = session.get(cluster.url(port, f'/hash/{height}'), timeout=5).json()['hash']
+            with lock:
+                mined.append({'node': port, 'height': height, 'hash': block_hash, 'time': mined_at,
+                              'txs': len(block['transactions'])})
+        except (requests.exceptions.RequestException, KeyError, ValueError):
+            pass
+
+    while not stop.is_set():
+        # miners act independently, so blocks may race each other and fork
+        t = threading.Thread(target=mine_on, args=(random.choice(cluster.ports),), daemon=True)
+        t.start()
+        threads.append(t)
+        stop.wait(random.expovariate(1.0 / interval))
+    for t in threads:
+        t.join(timeout=60)
+
+def tx_loop(cluster, rate, stop, counter):
+    session = requests.Session()
+    n = 0
+    while not stop.is_set():
+        port = random.choice(cluster.ports)
+        try:
+            r = session.post(cluster.url(port, '/transactions/new'),
+                             json={'sender': f'sim-{port}', 'recipient': 'sim-sink', 'amount': n}, timeout=5)
+            # counter: [accepted, rate limited or mempool full]
+            if r.status_code == 201:
+                counter[0] += 1
+            elif r.status_code == 429:
+                counter[1] += 1
+        except requests.exceptions.RequestException:
+            pass
+        n += 1
+        stop.wait(random.expovariate(rate))
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(round(q * (len(values) - 1))))], 4)
+
+def run(args):
+    random.seed(args.seed)
+    workdir = tempfile.mkdtemp(prefix="saxv_cluster_")
+    cluster = Cluster(args.nodes, args.base_port, args.p2p, workdir)
+    proxy = LossyProxy(args.latency, args.jitter, args.loss)
+    proxy.start({proxy_port: port for port, proxy_port in cluster.proxy_ports.items()})
+    report = {'config': vars(args), 'workdir': workdir}
+    try:
+        cluster.start()
+        cluster.connect(args.topology)
+
+        # every node starts from its own genesis: agree on one chain before measuring
+        requests.get(cluster.url(cluster.ports[0], '/mine'), timeout=60)
+        bootstrap = cluster.wait_converged(CONVERGE_TIMEOUT, nudge_every=1)
+        report['bootstrap_seconds'] = None if bootstrap is None else round(bootstrap, 3)
+
+        recorder = Recorder(cluster)
+        stop = threading.Event()
+        mined, lock, submitted = [], threading.Lock(), [0, 0]
+        workers = [threading.Thread(target=recorder.run, daemon=True),
+                   threading.Thread(target=mine_loop, args=(cluster, args.block_interval, stop, mined, lock), daemon=True)]
+        if args.tx_rate > 0:
+            workers.append(threading.Thread(target=tx_loop, args=(cluster, args.tx_rate, stop, submitted), daemon=True))
+        started = time.time()
+        for w in workers:
+            w.start()
+        time.sleep(args.duration)
+        stop.set()
+        for w in workers[1:]:
+            w.join(timeout=90)
+        load_seconds = time.time() - started
+
+        convergence = cluster.wait_converged(CONVERGE_TIMEOUT)
+        time.sleep(SAMPLE_INTERVAL * 4)
+        recorder.stop.set()
+        workers[0].join(timeout=10)
+
+        final = cluster.session.get(cluster.url(cluster.ports[0], '/chain'), timeout=30).json()['chain']
+        canonical = set()
+        for height in range(len(final)):
+            canonical.add((height, cluster.session.get(cluster.url(cluster.ports[0], f'/hash/{height}'), timeout=5).json()['hash']))
+
+        delays = []
+        for block in mined:
+            seen = recorder.first_seen.get((block['height'], block['hash']), {})
+            if len(seen) == len(cluster.ports):
+                delays.append(max(seen.values()) - block['time'])
+        orphans = [b for b in mined if (b['height'], b['hash']) not in canonical]
+        confirmed_txs = sum(1 for block in final for tx in block['transactions']
+                            if str(tx.get('sender', '')).startswith('sim-'))
+
+        report.update({
+            'load_seconds': round(load_seconds, 3),
+            'convergence_seconds': None if convergence is None else round(convergence, 3),
+            'converged': convergence is not None,
+            'blocks_mined': len(mined),
+            'orphaned_blocks': len(orphans),
+            'orphan_rate': round(len(orphans) / len(mined), 4) if mined else None,
+            'propagation_seconds': {
+                'samples': len(delays),
+                'mean': round(statistics.mean(delays), 4) if delays else None,
+                'p50': percentile(delays, 0.5),
+                'p95': percentile(delays, 0.95),
+                'max': round(max(delays), 4) if delays else None,
+            },
+            'final_length': len(final),
+            'txs_submitted': submitted[0],
+            'txs_throttled': submitted[1],
+            'txs_confirmed': confirmed_txs,
+            'tx_throughput_per_s': round(confirmed_txs / load_seconds, 3) if load_seconds else None,
+            'proxy_dropped_chunks': proxy.dropped,
+        })
+    finally:
+        cluster.stop()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SAXV Chain Mini v6 cluster and report consensus metrics")
+    parser.add_argument('--nodes', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30, help="seconds of mining/tx load")
+    parser.add_argument('--block-interval', type=float, default=3, help="mean seconds between mining attempts")
+    parser.add_argument('--tx-rate', type=float, default=5, help="transactions per second (0 = none)")
+    parser.add_argument('--latency', type=float, default=20, help="one-way proxy delay, ms")
+    parser.add_argument('--jitter', type=float, default=5, help="delay jitter, ms")
+    parser.add_argument('--loss', type=float, default=0.0, help="probability a chunk resets its connection")
+    parser.add_argument('--topology', choices=['full', 'ring', 'star'], default='full')
+    parser.add_argument('--base-port', type=int, default=5600, help="first node port; proxies use port + 100")
+    parser.add_argument('--p2p', action='store_true', help="let nodes open direct TCP peer links (not proxied)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', help="also write the JSON report to this file")
+    parser.add_argument('--keep', action='store_true', help="keep node data dirs and logs")
+    args = parser.parse_args()
+
+    report = run(args)
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+if __name__ == '__main__':
+    main()
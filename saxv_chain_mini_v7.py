@@ -11,6 +11,10 @@ from ecdsa import SigningKey, VerifyingKey, NIST384p
 # Blockchain and Block Class
 # ----------------------------
 class Block:
+    # hashed fields in canonical (sorted) order; the hash itself is never hashed
+    FIELDS = ('index', 'nonce', 'previous_hash', 'timestamp', 'transactions')
+    __slots__ = FIELDS + ('hash',)
+
     def __init__(self, index, transactions, previous_hash, timestamp=None, nonce=0):
         self.index = index
         self.transactions = transactions
@@ -19,9 +23,38 @@ class Block:
         self.nonce = nonce
         self.hash = self.compute_hash()
 
+    def fields(self):
+        return {name: getattr(self, name) for name in Block.FIELDS}
+
+    def encoded_parts(self):
+        """
+        Canonical JSON of FIELDS split around the nonce value
+        """
+        parts = [f'"{name}": {json.dumps(getattr(self, name), sort_keys=True)}' for name in Block.FIELDS]
+        at = Block.FIELDS.index('nonce')
+        head = '{' + ''.join(part + ', ' for part in parts[:at]) + '"nonce": '
+        tail = ''.join(', ' + part for part in parts[at + 1:]) + '}'
+        return head, tail
+
     def compute_hash(self):
-        block_string = json.dumps(self.__dict__, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        head, tail = self.encoded_parts()
+        return hashlib.sha256(f'{head}{self.nonce}{tail}'.encode()).hexdigest()
+
+    def mine(self, difficulty):
+        """
+        Search nonces until the hash meets difficulty; the fixed fields are encoded once
+        """
+        head, tail = self.encoded_parts()
+        target = '0' * difficulty
+        while not self.hash.startswith(target):
+            self.nonce += 1
+            self.hash = hashlib.sha256(f'{head}{self.nonce}{tail}'.encode()).hexdigest()
+        return self.hash
+
+    def to_dict(self):
+        data = self.fields()
+        data['hash'] = self.hash
+        return data
 
 class Blockchain:
     difficulty = 2  # adjustable for HP
@@ -52,9 +85,7 @@ class Blockchain:
             transactions=self.pending_transactions,
             previous_hash=self.last_block().hash
         )
-        while not new_block.hash.startswith('0'*Blockchain.difficulty):
-            new_block.nonce += 1
-            new_block.hash = new_block.compute_hash()
+        new_block.mine(Blockchain.difficulty)
         self.chain.append(new_block)
         self.pending_transactions = []
         return new_block
@@ -9,6 +9,10 @@ from threading import Thread
 
 # ==== BLOCKCHAIN ====
 class Block:
+    # hashed fields in canonical (sorted) order; the hash itself is never hashed
+    FIELDS = ('index', 'nonce', 'previous_hash', 'timestamp', 'transactions')
+    __slots__ = FIELDS + ('hash',)
+
     def __init__(self, index, timestamp, transactions, previous_hash):
         self.index = index
         self.timestamp = timestamp
@@ -17,10 +21,18 @@ class Block:
         self.nonce = 0
         self.hash = self.compute_hash()
 
+    def fields(self):
+        return {name: getattr(self, name) for name in Block.FIELDS}
+
     def compute_hash(self):
-        block_string = json.dumps(self.__dict__, sort_keys=True)
+        block_string = json.dumps(self.fields(), sort_keys=True)
         return hashlib.sha256(block_string.encode()).hexdigest()
 
+    def to_dict(self):
+        data = self.fields()
+        data['hash'] = self.hash
+        return data
+
 class Blockchain:
     def __init__(self):
         self.chain = []
@@ -1,10 +1,18 @@
 import hashlib
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from time import time
 from uuid import uuid4
 from flask import Flask, jsonify, request
 from ecdsa import SigningKey, SECP256k1, VerifyingKey, BadSignatureError
 
+MAX_TX_SUBMIT = 5000  # max transaksi per request /transactions/batch
+VERIFY_CHUNK = 250    # tanda tangan per tugas di pool verifikasi
+VERIFY_WORKERS = os.cpu_count() or 1
+
+verifier = None  # ProcessPoolExecutor, dibuat di __main__ sebelum Flask jalan
+
 # ======= Wallet =======
 class Wallet:
     def __init__(self):
@@ -25,6 +33,28 @@ class Wallet:
         except BadSignatureError:
             return False
 
+    @staticmethod
+    def verify_batch(items):
+        """
+        Cek banyak (public_key_hex, message, signature_hex) sekaligus.
+        ecdsa murni Python (kena GIL), jadi batch besar dipecah per VERIFY_CHUNK
+        dan dicek paralel di beberapa proses. Return list bool, urutan sama.
+        """
+        if verifier is None or len(items) <= VERIFY_CHUNK:
+            return verify_chunk(items)
+        chunks = [items[i:i + VERIFY_CHUNK] for i in range(0, len(items), VERIFY_CHUNK)]
+        return [ok for part in verifier.map(verify_chunk, chunks) for ok in part]
+
+def verify_chunk(items):
+    # key/tanda tangan yang rusak dihitung tidak valid, bukan error
+    results = []
+    for public_key_hex, message, signature_hex in items:
+        try:
+            results.append(bool(Wallet.verify_signature(public_key_hex, message, signature_hex)))
+        except Exception:
+            results.append(False)
+    return results
+
 # ======= Blockchain =======
 class Blockchain:
     def __init__(self):
@@ -58,6 +88,36 @@ class Blockchain:
         self.current_transactions.append(transaction)
         return self.last_block['index'] + 1
 
+    def new_transactions(self, entries):
+        """
+        Tambah banyak transaksi sekaligus; semua tanda tangan dicek sebagai satu batch.
+        Reward (sender "0") tidak bisa dikirim lewat sini.
+        Return satu hasil per transaksi, urutan sama dengan entries:
+        {'status': 'accepted' | 'invalid', 'tx_hash': ...} (tx_hash hanya untuk transaksi yang lengkap)
+        """
+        required = ['sender', 'recipient', 'amount', 'signature']
+        results = [{'status': 'invalid'} for _ in entries]
+        candidates = []  # (posisi, transaksi, tanda tangan)
+        for i, entry in enumerate(entries):
+            if isinstance(entry, dict) and all(k in entry for k in required) and entry['sender'] != "0":
+                transaction = {
+                    'sender': entry['sender'],
+                    'recipient': entry['recipient'],
+                    'amount': entry['amount']
+                }
+                candidates.append((i, transaction, entry['signature']))
+
+        verified = Wallet.verify_batch([(tx['sender'], tx, signature) for _, tx, signature in candidates])
+        for (i, transaction, _), ok in zip(candidates, verified):
+            results[i] = {'status': 'accepted' if ok else 'invalid', 'tx_hash': self.tx_hash(transaction)}
+            if ok:
+                self.current_transactions.append(transaction)
+        return results
+
+    @staticmethod
+    def tx_hash(tx):
+        return hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+
     @staticmethod
     def hash(block):
         block_string = json.dumps(block, sort_keys=True).encode()
@@ -129,6 +189,23 @@ def new_transaction():
 
     return jsonify({'message': f'Transaction will be added to Block {index}'}), 201
 
+# banyak transaksi bertanda tangan dalam satu request: {"transactions": [...]}
+@app.route('/transactions/batch', methods=['POST'])
+def new_transaction_batch():
+    values = request.get_json()
+    txs = values.get('transactions') if isinstance(values, dict) else None
+    if not isinstance(txs, list):
+        return 'Missing values', 400
+    if len(txs) > MAX_TX_SUBMIT:
+        return jsonify({'message': f'Maksimal {MAX_TX_SUBMIT} transaksi per batch'}), 413
+
+    results = blockchain.new_transactions(txs)
+    return jsonify({
+        'accepted': sum(result['status'] == 'accepted' for result in results),
+        'results': results,
+        'block': blockchain.last_block['index'] + 1,
+    }), 200
+
 @app.route('/chain', methods=['GET'])
 def full_chain():
     response = {
@@ -145,4 +222,12 @@ def get_wallet():
     }), 200
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    if VERIFY_WORKERS > 1:
+        # proses verifikasi dibuat sekarang, selagi belum ada thread Flask yang ikut ter-fork
+        verifier = ProcessPoolExecutor(max_workers=VERIFY_WORKERS)
+        list(verifier.map(verify_chunk, [[]] * VERIFY_WORKERS))
+    try:
+        app.run(host='0.0.0.0', port=5000)
+    finally:
+        if verifier is not None:
+            verifier.shutdown(cancel_futures=True)
\ No newline at end of file
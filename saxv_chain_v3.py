@@ -4,9 +4,21 @@ from time import time
 from uuid import uuid4
 from flask import Flask, jsonify, request
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 import requests
+from requests.adapters import HTTPAdapter
 from ecdsa import SigningKey, SECP256k1, VerifyingKey, BadSignatureError
 
+PEER_WORKERS = 8     # peers polled concurrently
+ROUND_DEADLINE = 8   # seconds per consensus round
+POOL_HOSTS = 16      # peer hosts whose keep-alive connections are kept
+POOL_SIZE = PEER_WORKERS
+CHAIN_TIMEOUT = (2, 10)  # (connect, read) seconds for a full /chain download
+
+# keep-alive session shared by all peer requests, pooled per host
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE))
+
 # ======= Wallet =======
 class Wallet:
     def __init__(self):
@@ -57,22 +69,38 @@ class Blockchain:
 
         return True
 
+    def fetch_chain(self, node, min_length):
+        try:
+            response = session.get(f'http://{node}/chain', timeout=CHAIN_TIMEOUT)
+            if response.status_code == 200:
+                length = response.json()['length']
+                chain = response.json()['chain']
+                if length > min_length and self.valid_chain(chain):
+                    return length, chain
+        except (requests.exceptions.RequestException, KeyError, TypeError, ValueError, IndexError):
+            # unreachable peer, or a malformed / incomplete chain: treat it as failed
+            pass
+        return None
+
     def resolve_conflicts(self):
-        neighbours = self.nodes
+        neighbours = list(self.nodes)
         new_chain = None
         max_length = len(self.chain)
+        if not neighbours:
+            return False
 
-        for node in neighbours:
-            try:
-                response = requests.get(f'http://{node}/chain')
-                if response.status_code == 200:
-                    length = response.json()['length']
-                    chain = response.json()['chain']
-                    if length > max_length and self.valid_chain(chain):
-                        max_length = length
-                        new_chain = chain
-            except requests.exceptions.RequestException:
-                continue
+        # poll all peers at once; the round ends at ROUND_DEADLINE whatever is still pending
+        pool = ThreadPoolExecutor(max_workers=min(PEER_WORKERS, len(neighbours)))
+        futures = [pool.submit(self.fetch_chain, node, max_length) for node in neighbours]
+        try:
+            for future in as_completed(futures, timeout=ROUND_DEADLINE):
+                result = future.result()
+                if result and result[0] > max_length:
+                    max_length, new_chain = result
+        except FuturesTimeout:
+            pass
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
         if new_chain:
             self.chain = new_chain
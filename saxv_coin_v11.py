@@ -1,12 +1,15 @@
 import hashlib
 import json
+import sys
 import time
 from uuid import uuid4
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 import requests
+from requests.adapters import HTTPAdapter
 import tkinter as tk
 from tkinter import messagebox
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from multiprocessing import Process
 
 # ---------------------------
@@ -15,10 +18,31 @@ from multiprocessing import Process
 SUPPLY = 31_000_000
 MINING_REWARD = 10
 NODE_ID = str(uuid4()).replace('-', '')
+SYNC_WORKERS = 8    # peers polled concurrently
+SYNC_DEADLINE = 8   # detik per sync round
+SYNC_INTERVAL = 10  # detik antar sync round (dihitung dari selesai round)
+PORT = 5000         # port Flask, ikut dikirim saat announce block
+BACKOFF_BASE = 5    # detik skip peer setelah gagal pertama, dobel tiap gagal lagi
+BACKOFF_MAX = 600   # batas atas backoff
+QUARANTINE_TIME = 1800  # detik karantina per chain tidak valid dari peer
+MAX_RANGE = 200     # max header/block per respons /headers dan /blocks
+POOL_HOSTS = 16     # jumlah host peer yang koneksi keep-alive-nya disimpan
+POOL_SIZE = SYNC_WORKERS  # koneksi keep-alive per host
+# timeout (connect, read) per jenis request
+TIMEOUTS = {
+    'probe': (2, 3),      # header tip, announce
+    'download': (2, 10),  # range /blocks dan /headers
+    'rpc': (2, None),     # /mine_block lokal, tunggu sampai mining selesai
+}
+ASYNC_SERVER = '--async-server' in sys.argv[1:]  # API dilayani event loop asyncio (saxv_async_server.py), bukan app.run
 AUTO_MINING_INTERVAL = 15  # detik
 AUTO_TX_INTERVAL = 20      # detik
 AUTO_TX_RECEIVER = 'reward_address_123'
 
+# satu session keep-alive untuk semua request ke peer dan ke node lokal
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE))
+
 # ---------------------------
 # BLOCKCHAIN CLASS
 # ---------------------------
@@ -82,7 +106,15 @@ class Blockchain:
 blockchain=Blockchain()
 wallet={'address': NODE_ID,'balance': SUPPLY}
 nodes=set()
-node_status = {}
+# announce kirim/terima block baru di background
+announce_pool = ThreadPoolExecutor(max_workers=SYNC_WORKERS)
+# poll chain peer tiap ronde sync, dipakai ulang antar ronde
+sync_pool = ThreadPoolExecutor(max_workers=SYNC_WORKERS)
+# kesehatan peer: latency, gagal beruntun (backoff), pelanggaran (karantina)
+peer_health = {}
+health_lock = threading.Lock()
+# cek tip + append/ganti chain (mining, announce, sync) dijaga satu lock
+chain_lock = threading.Lock()
 
 # ---------------------------
 # FLASK SERVER
@@ -91,12 +123,16 @@ app=Flask(__name__)
 
 @app.route('/mine_block',methods=['GET'])
 def mine_block():
-    prev_block=blockchain.get_previous_block()
-    prev_proof=prev_block['proof']
-    proof=blockchain.proof_of_work(prev_proof)
-    prev_hash=blockchain.hash(prev_block)
-    blockchain.add_transaction("SYSTEM",wallet['address'],MINING_REWARD)
-    block=blockchain.create_block(proof,prev_hash)
+    while True:
+        prev_block=blockchain.get_previous_block()
+        proof=blockchain.proof_of_work(prev_block['proof'])
+        with chain_lock:
+            # tip berubah selama proof of work (block dari peer / sync): ulangi di tip baru
+            if blockchain.get_previous_block() is prev_block:
+                blockchain.add_transaction("SYSTEM",wallet['address'],MINING_REWARD)
+                block=blockchain.create_block(proof,blockchain.hash(prev_block))
+                break
+    announce_block(block)
     wallet['balance']+=MINING_REWARD
     return jsonify({'message':'Block mined!','index':block['index']}),200
 
@@ -109,65 +145,386 @@ def add_transaction():
     blockchain.add_transaction(tx['sender'],tx['receiver'],tx['amount'])
     return jsonify({'message':'Transaction added'}),201
 
-@app.route('/get_chain',methods=['GET'])
+def stream_blocks(blocks, start, stop):
+    # satu block per baris, diserialisasi saat dikirim
+    for i in range(start, stop):
+        yield json.dumps(blocks[i]) + '\n'
+
+# ?offset=&limit= untuk satu halaman, ?stream=1 untuk NDJSON chunked
+@app.route('/get_chain', methods=['GET'])
 def get_chain():
-    return jsonify({'chain':blockchain.chain,'length':len(blockchain.chain)}),200
+    blocks = blockchain.chain
+    length = len(blocks)
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return 'Invalid offset/limit', 400
+    stop = length if limit is None else min(length, offset + limit)
+    if request.args.get('stream'):
+        return Response(stream_blocks(blocks, offset, stop), mimetype='application/x-ndjson',
+                        headers={'X-Chain-Length': str(length)})
+    return jsonify({'chain': blocks[offset:stop], 'length': length}), 200
+
+def range_args():
+    start=request.args.get('from',0,type=int)
+    count=request.args.get('count',MAX_RANGE,type=int)
+    if start<0 or count<0:
+        return None
+    return start,min(count,MAX_RANGE)
+
+@app.route('/headers',methods=['GET'])
+def get_headers():
+    parsed=range_args()
+    if parsed is None:
+        return 'Invalid range',400
+    start,count=parsed
+    headers=[{'index':b['index'],'timestamp':b['timestamp'],'proof':b['proof'],
+              'previous_hash':b['previous_hash'],'hash':blockchain.hash(b)}
+             for b in blockchain.chain[start:start+count]]
+    return jsonify({'from':start,'headers':headers,'length':len(blockchain.chain)}),200
+
+@app.route('/blocks',methods=['GET'])
+def get_blocks():
+    parsed=range_args()
+    if parsed is None:
+        return 'Invalid range',400
+    start,count=parsed
+    return jsonify({'from':start,'blocks':blockchain.chain[start:start+count],'length':len(blockchain.chain)}),200
 
 @app.route('/connect_node',methods=['POST'])
 def connect_node():
     node=request.get_json().get('node_address')
     if node:
         nodes.add(node)
-        node_status[node] = 'unknown'
         return jsonify({'message':'Node connected','total_nodes':list(nodes)}),201
     return 'No node address',400
 
+# status peer untuk GUI (GUI jalan di proses lain, tidak bisa baca peer_health langsung)
+@app.route('/peer_health',methods=['GET'])
+def peer_health_status():
+    with health_lock:
+        return jsonify({node: peer_status(node) for node in sorted(nodes)}),200
+
+@app.route('/jobs',methods=['GET'])
+def job_stats():
+    return jsonify({'jobs': scheduler.stats()}),200
+
+@app.route('/announce_block',methods=['POST'])
+def receive_block():
+    msg = request.get_json()
+    required = ['hash', 'index', 'port']
+    if not msg or not all(k in msg for k in required):
+        return 'Missing data', 400
+    # block diambil dari port yang diumumkan pengirim
+    source = f"http://{request.remote_addr}:{msg['port']}"
+    announce_pool.submit(receive_announcement, source, msg['hash'], msg['index'])
+    return jsonify({'message': 'Announcement accepted'}), 202
+
 # ---------------------------
 # SYNC & AUTO FUNCTIONS
 # ---------------------------
-def sync_chain():
-    global blockchain, node_status
-    for node in nodes:
+def peer_entry(node):
+    return peer_health.setdefault(node, {'latency': None, 'failures': 0, 'retry_at': 0.0,
+                                         'offenses': 0, 'quarantined_until': 0.0})
+
+def record_success(node, latency):
+    with health_lock:
+        entry = peer_entry(node)
+        previous = entry['latency']
+        entry['latency'] = latency if previous is None else 0.7 * previous + 0.3 * latency
+        entry['failures'] = 0
+        entry['retry_at'] = 0.0
+
+def record_failure(node):
+    # backoff eksponensial: BACKOFF_BASE, 2x, 4x, ... maksimal BACKOFF_MAX
+    with health_lock:
+        entry = peer_entry(node)
+        entry['failures'] += 1
+        entry['retry_at'] = time.time() + min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (entry['failures'] - 1))
+
+def record_invalid(node):
+    # peer yang kirim chain tidak valid dikarantina, makin lama tiap pelanggaran
+    with health_lock:
+        entry = peer_entry(node)
+        entry['offenses'] += 1
+        entry['quarantined_until'] = time.time() + QUARANTINE_TIME * entry['offenses']
+
+def peer_status(node):
+    # label untuk GUI
+    entry = peer_health.get(node)
+    now = time.time()
+    if not entry or (entry['latency'] is None and not entry['failures']):
+        return 'unknown'
+    if now < entry['quarantined_until']:
+        return 'quarantined'
+    if entry['failures']:
+        return f"offline (retry {max(0, int(entry['retry_at'] - now))}s)"
+    return f"online ({entry['latency'] * 1000:.0f} ms)"
+
+def ranked_peers():
+    # hanya peer yang tidak sedang backoff/karantina, yang tercepat duluan
+    now = time.time()
+    with health_lock:
+        ready = [n for n in nodes
+                 if now >= peer_entry(n)['retry_at'] and now >= peer_entry(n)['quarantined_until']]
+        return sorted(ready, key=lambda n: peer_health[n]['latency'] or 0.0)
+
+def fetch_range(node, kind, start, end):
+    items = []
+    while start + len(items) < end:
+        count = min(MAX_RANGE, end - start - len(items))
+        r = session.get(f"{node}/{kind}", params={'from': start + len(items), 'count': count},
+                        timeout=TIMEOUTS['download'])
+        r.raise_for_status()
+        page = r.json().get(kind)
+        if not page:
+            break
+        items.extend(page)
+    return items
+
+def find_fork(node, chain, length):
+    # binary search tinggi tertinggi (posisi list) dengan hash block yang sama; -1 kalau genesis pun beda
+    lo, hi = 0, min(len(chain), length) - 1
+    fork = -1
+    probe = hi  # kasus umum dulu: peer cuma memperpanjang tip kita
+    while lo <= hi:
+        r = session.get(f"{node}/headers", params={'from': probe, 'count': 1}, timeout=TIMEOUTS['probe'])
+        r.raise_for_status()
+        headers = r.json()['headers']
+        if headers and headers[0]['hash'] == blockchain.hash(chain[probe]):
+            fork = probe
+            lo = probe + 1
+        else:
+            hi = probe - 1
+        probe = (lo + hi) // 2
+    return fork
+
+def fetch_chain(node):
+    """
+    Headers-first: cek header peer di tinggi tip kita, cari titik fork dari
+    header lalu download hanya block yang belum kita punya.
+    Hasil: (length, fork, hash block di fork atau None, blocks) atau None.
+    """
+    try:
+        chain = blockchain.chain
+        tip = len(chain) - 1
+        started = time.time()
+        r = session.get(f"{node}/headers", params={'from': tip, 'count': 1}, timeout=TIMEOUTS['probe'])
+        if r.status_code != 200:
+            record_failure(node)
+            return None
+        record_success(node, time.time() - started)
+        data = r.json()
+        length = data['length']
+        if length <= len(chain):
+            return None
+        headers = data['headers']
+        if headers and headers[0]['hash'] == blockchain.hash(chain[tip]):
+            fork = tip
+        else:
+            # fork di bawah tip
+            fork = find_fork(node, chain, min(tip, length))
+        blocks = fetch_range(node, 'blocks', fork + 1, length)
+        if fork + 1 + len(blocks) != length:
+            return None
+        anchor = blockchain.hash(chain[fork]) if fork >= 0 else None
+        return length, fork, anchor, blocks
+    except:
+        record_failure(node)
+    return None
+
+def sync_once():
+    global blockchain
+    peers = ranked_peers()
+    if peers:
+        # poll every peer at once; peers still pending at SYNC_DEADLINE are skipped this round.
+        # backed-off and quarantined peers are not in the list, fastest peers go first
+        futures = {sync_pool.submit(fetch_chain, node): node for node in peers}
         try:
-            r=requests.get(f"{node}/get_chain",timeout=3)
-            if r.status_code==200:
-                length=r.json()['length']
-                chain=r.json()['chain']
-                if length>len(blockchain.chain) and blockchain.is_chain_valid(chain):
-                    blockchain.chain=chain
-                node_status[node] = 'online'
-            else:
-                node_status[node] = 'offline'
-        except:
-            node_status[node] = 'offline'
-    threading.Timer(10.0,sync_chain).start()
+            for future in as_completed(futures, timeout=SYNC_DEADLINE):
+                result = future.result()
+                if not result or result[0] <= len(blockchain.chain):
+                    continue
+                length, fork, anchor, blocks = result
+                with chain_lock:
+                    chain = blockchain.chain
+                    # chain kita sudah diganti sejak fetch dimulai: leluhur bersama bisa
+                    # sudah hilang, jadi peer ini dilewati dulu (bukan salah peer)
+                    if length <= len(chain) or (
+                            fork >= 0 and (fork >= len(chain) or blockchain.hash(chain[fork]) != anchor)):
+                        continue
+                    # validasi suffix mulai dari leluhur bersama saja
+                    candidate = chain[fork:fork+1] + blocks
+                    try:
+                        valid = blockchain.is_chain_valid(candidate)
+                    except (KeyError, TypeError, ValueError, IndexError):
+                        valid = False  # block rusak / tidak lengkap
+                    if valid:
+                        blockchain.chain = chain[:fork+1] + blocks
+                if not valid:
+                    record_invalid(futures[future])
+        except FuturesTimeout:
+            pass
+        finally:
+            # peer yang belum sempat di-poll dilewati ronde ini
+            for future in futures:
+                future.cancel()
+
+def announce_block(block):
+    # kirim hash + index saja; peer ambil block-nya sendiri
+    message = {'hash': blockchain.hash(block), 'index': block['index'], 'port': PORT}
+    for node in ranked_peers():
+        announce_pool.submit(post_announcement, node, message)
+
+def post_announcement(node, message):
+    try:
+        session.post(f"{node}/announce_block", json=message, timeout=TIMEOUTS['probe'])
+    except:
+        record_failure(node)
+
+def receive_announcement(source, block_hash, index):
+    """
+    Block yang diumumkan langsung menyambung tip: ambil satu block itu,
+    validasi, append lalu teruskan ke peer lain. Selain itu fallback ke sync.
+    """
+    if index <= len(blockchain.chain):
+        return
+    if index > len(blockchain.chain) + 1:
+        sync_once()
+        return
+    try:
+        blocks = fetch_range(source, 'blocks', index - 1, index)
+    except:
+        return
+    if not blocks or blockchain.hash(blocks[0]) != block_hash:
+        return
+    with chain_lock:
+        if len(blockchain.chain) != index - 1:
+            return
+        appended = blockchain.is_chain_valid([blockchain.chain[-1], blocks[0]])
+        if appended:
+            blockchain.chain.append(blocks[0])
+    if appended:
+        announce_block(blocks[0])
+    else:
+        sync_once()
 
 def auto_mining():
     try:
-        requests.get('http://127.0.0.1:5000/mine_block')
+        session.get(f'http://127.0.0.1:{PORT}/mine_block', timeout=TIMEOUTS['rpc'])
         wallet['balance']+=MINING_REWARD
     except:
         pass
-    threading.Timer(AUTO_MINING_INTERVAL,auto_mining).start()
 
 def auto_transaction():
     if wallet['balance']>=50:
         blockchain.add_transaction(wallet['address'],AUTO_TX_RECEIVER,50)
         wallet['balance']-=50
-    threading.Timer(AUTO_TX_INTERVAL,auto_transaction).start()
+
+# ---------------------------
+# SCHEDULER
+# ---------------------------
+class Scheduler:
+    """
+    Satu thread penjadwal + pool worker tetap untuk semua job periodik
+    (pengganti threading.Timer berantai yang bikin thread baru tiap tick).
+    fixed_rate=True: jadwal tetap tiap interval, tick yang jatuh saat run
+    sebelumnya masih jalan di-skip. fixed_rate=False: interval dihitung dari
+    selesainya run. Runtime tiap job dicatat, lihat /jobs.
+    """
+    def __init__(self, workers=4):
+        self.jobs = []
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+
+    def every(self, interval, func, fixed_rate=True, delay=0, name=None):
+        self.jobs.append({'name': name or func.__name__, 'func': func, 'interval': interval,
+                          'fixed_rate': fixed_rate, 'next_run': time.monotonic() + delay,
+                          'running': False, 'runs': 0, 'skipped': 0, 'errors': 0,
+                          'last_runtime': None, 'max_runtime': 0.0, 'total_runtime': 0.0})
+
+    def start(self):
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _loop(self):
+        while True:
+            now = time.monotonic()
+            with self.lock:
+                for job in self.jobs:
+                    if job['next_run'] > now:
+                        continue
+                    if job['running']:
+                        job['skipped'] += 1
+                    else:
+                        job['running'] = True
+                        self.pool.submit(self._run, job)
+                    if job['fixed_rate']:
+                        # tetap di grid jadwal; tick yang sudah lewat semua dihitung skip
+                        missed = int((now - job['next_run']) // job['interval'])
+                        job['skipped'] += missed
+                        job['next_run'] += (missed + 1) * job['interval']
+                    else:
+                        job['next_run'] = float('inf')  # diisi lagi saat run selesai
+                next_run = min((job['next_run'] for job in self.jobs), default=now + 1)
+            self.wakeup.wait(min(1.0, max(0.0, next_run - now)))
+            self.wakeup.clear()
+
+    def _run(self, job):
+        started = time.monotonic()
+        failed = False
+        try:
+            job['func']()
+        except Exception:
+            failed = True
+        runtime = time.monotonic() - started
+        with self.lock:
+            job['running'] = False
+            job['runs'] += 1
+            job['errors'] += failed
+            job['last_runtime'] = runtime
+            job['max_runtime'] = max(job['max_runtime'], runtime)
+            job['total_runtime'] += runtime
+            if not job['fixed_rate']:
+                job['next_run'] = time.monotonic() + job['interval']
+        self.wakeup.set()
+
+    def stats(self):
+        with self.lock:
+            return [{
+                'name': job['name'],
+                'interval': job['interval'],
+                'fixed_rate': job['fixed_rate'],
+                'running': job['running'],
+                'runs': job['runs'],
+                'skipped': job['skipped'],
+                'errors': job['errors'],
+                'last_runtime': job['last_runtime'],
+                'max_runtime': job['max_runtime'],
+                'avg_runtime': job['total_runtime'] / job['runs'] if job['runs'] else None,
+            } for job in self.jobs]
+
+scheduler = Scheduler()
 
 def run_flask():
-    sync_chain()
-    auto_mining()
-    auto_transaction()
-    app.run(host='0.0.0.0',port=5000)
+    scheduler.every(SYNC_INTERVAL, sync_once, fixed_rate=False, name='sync_chain')
+    # request mining pertama menunggu server Flask sudah jalan
+    scheduler.every(AUTO_MINING_INTERVAL, auto_mining, delay=AUTO_MINING_INTERVAL)
+    scheduler.every(AUTO_TX_INTERVAL, auto_transaction)
+    scheduler.start()
+    if ASYNC_SERVER:
+        from saxv_async_server import serve
+        # mining dan sync ke peer jalan di worker sendiri, request ringan tidak ikut antre
+        serve(app,port=PORT,slow_paths=('/mine_block',),slow_workers=1)
+    else:
+        app.run(host='0.0.0.0',port=PORT)
 
 # ---------------------------
 # GUI
 # ---------------------------
 def mine_gui():
     try:
-        requests.get('http://127.0.0.1:5000/mine_block')
+        session.get(f'http://127.0.0.1:{PORT}/mine_block', timeout=TIMEOUTS['rpc'])
         wallet['balance']+=MINING_REWARD
         update_display()
         messagebox.showinfo("Mining","Block mined!")
@@ -195,8 +552,13 @@ def update_display():
     for block in blockchain.chain:
         text_chain.insert(tk.END,f"Index:{block['index']} | TX:{len(block['transactions'])}\n")
     text_nodes.delete(1.0,tk.END)
-    for node,status in node_status.items():
-        text_nodes.insert(tk.END,f"{node} : {status}\n")
+    try:
+        status = session.get(f'http://127.0.0.1:{PORT}/peer_health', timeout=TIMEOUTS['probe']).json()
+    except Exception:
+        text_nodes.insert(tk.END,"Server belum running\n")
+        return
+    for node, label in status.items():
+        text_nodes.insert(tk.END,f"{node} : {label}\n")
 
 def run_gui():
     root=tk.Tk()
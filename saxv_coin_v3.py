@@ -10,6 +10,10 @@ DATA_FILE = "saxv_chain_v3.json"
 DIFFICULTY = 2   # very small so phone tidak ngadat (ubah ke 3 kalau mau lebih kuat)
 
 class Block:
+    # hashed fields, in hash order; slots keep a long chain compact in RAM
+    HASH_FIELDS = ("index", "timestamp", "transactions", "previous_hash", "nonce")
+    __slots__ = HASH_FIELDS + ("hash",)
+
     def __init__(self, index, transactions, previous_hash, timestamp=None, nonce=0, hash_value=None):
         self.index = int(index)
         self.timestamp = float(timestamp) if timestamp is not None else time.time()
@@ -20,7 +24,7 @@ class Block:
         self.hash = hash_value if hash_value is not None else self.calculate_hash()
 
     def calculate_hash(self):
-        block_string = f"{self.index}|{self.timestamp}|{self.transactions}|{self.previous_hash}|{self.nonce}"
+        block_string = "|".join(str(getattr(self, name)) for name in Block.HASH_FIELDS)
         return hashlib.sha256(block_string.encode()).hexdigest()
 
     def to_dict(self):
@@ -3,10 +3,11 @@ import json
 import time
 from uuid import uuid4
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 import requests
 import tkinter as tk
 from tkinter import messagebox
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from multiprocessing import Process
 
 # ---------------------------
@@ -15,6 +16,12 @@ from multiprocessing import Process
 SUPPLY = 31_000_000
 MINING_REWARD = 10
 NODE_ID = str(uuid4()).replace('-', '')
+SYNC_WORKERS = 8    # peers polled concurrently
+SYNC_DEADLINE = 8   # detik per sync round
+PORT = 5000         # port Flask, ikut dikirim saat announce block
+BACKOFF_BASE = 5    # detik skip peer setelah gagal pertama, dobel tiap gagal lagi
+BACKOFF_MAX = 600   # batas atas backoff
+QUARANTINE_TIME = 1800  # detik karantina per chain tidak valid dari peer
 
 # ---------------------------
 # BLOCKCHAIN CLASS
@@ -83,6 +90,13 @@ class Blockchain:
 blockchain = Blockchain()
 wallet = {'address': NODE_ID, 'balance': SUPPLY}
 nodes = set()
+# announce kirim/terima block baru di background
+announce_pool = ThreadPoolExecutor(max_workers=SYNC_WORKERS)
+# kesehatan peer: latency, gagal beruntun (backoff), pelanggaran (karantina)
+peer_health = {}
+health_lock = threading.Lock()
+# cek tip + append/ganti chain (mining, announce, sync) dijaga satu lock
+chain_lock = threading.Lock()
 
 # ---------------------------
 # FLASK SERVER
@@ -91,12 +105,16 @@ app = Flask(__name__)
 
 @app.route('/mine_block', methods=['GET'])
 def mine_block():
-    prev_block = blockchain.get_previous_block()
-    prev_proof = prev_block['proof']
-    proof = blockchain.proof_of_work(prev_proof)
-    prev_hash = blockchain.hash(prev_block)
-    blockchain.add_transaction("SYSTEM", wallet['address'], MINING_REWARD)
-    block = blockchain.create_block(proof, prev_hash)
+    while True:
+        prev_block = blockchain.get_previous_block()
+        proof = blockchain.proof_of_work(prev_block['proof'])
+        with chain_lock:
+            # tip berubah selama proof of work (block dari peer / sync): ulangi di tip baru
+            if blockchain.get_previous_block() is prev_block:
+                blockchain.add_transaction("SYSTEM", wallet['address'], MINING_REWARD)
+                block = blockchain.create_block(proof, blockchain.hash(prev_block))
+                break
+    announce_block(block)
     wallet['balance'] += MINING_REWARD
     return jsonify({'message': 'Block mined!', 'index': block['index']}), 200
 
@@ -109,9 +127,25 @@ def add_transaction():
     blockchain.add_transaction(tx['sender'], tx['receiver'], tx['amount'])
     return jsonify({'message':'Transaction added'}), 201
 
+def stream_blocks(blocks, start, stop):
+    # satu block per baris, diserialisasi saat dikirim
+    for i in range(start, stop):
+        yield json.dumps(blocks[i]) + '\n'
+
+# ?offset=&limit= untuk satu halaman, ?stream=1 untuk NDJSON chunked
 @app.route('/get_chain', methods=['GET'])
 def get_chain():
-    return jsonify({'chain': blockchain.chain, 'length': len(blockchain.chain)}), 200
+    blocks = blockchain.chain
+    length = len(blocks)
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return 'Invalid offset/limit', 400
+    stop = length if limit is None else min(length, offset + limit)
+    if request.args.get('stream'):
+        return Response(stream_blocks(blocks, offset, stop), mimetype='application/x-ndjson',
+                        headers={'X-Chain-Length': str(length)})
+    return jsonify({'chain': blocks[offset:stop], 'length': length}), 200
 
 @app.route('/connect_node', methods=['POST'])
 def connect_node():
@@ -121,23 +155,139 @@ def connect_node():
         return jsonify({'message':'Node connected','total_nodes':list(nodes)}), 201
     return 'No node address', 400
 
-def sync_chain():
+@app.route('/announce_block', methods=['POST'])
+def receive_block():
+    msg = request.get_json()
+    required = ['hash', 'index', 'port']
+    if not msg or not all(k in msg for k in required):
+        return 'Missing data', 400
+    # block diambil dari port yang diumumkan pengirim
+    source = f"http://{request.remote_addr}:{msg['port']}"
+    announce_pool.submit(receive_announcement, source, msg['hash'], msg['index'])
+    return jsonify({'message': 'Announcement accepted'}), 202
+
+def peer_entry(node):
+    return peer_health.setdefault(node, {'latency': None, 'failures': 0, 'retry_at': 0.0,
+                                         'offenses': 0, 'quarantined_until': 0.0})
+
+def record_success(node, latency):
+    with health_lock:
+        entry = peer_entry(node)
+        previous = entry['latency']
+        entry['latency'] = latency if previous is None else 0.7 * previous + 0.3 * latency
+        entry['failures'] = 0
+        entry['retry_at'] = 0.0
+
+def record_failure(node):
+    # backoff eksponensial: BACKOFF_BASE, 2x, 4x, ... maksimal BACKOFF_MAX
+    with health_lock:
+        entry = peer_entry(node)
+        entry['failures'] += 1
+        entry['retry_at'] = time.time() + min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (entry['failures'] - 1))
+
+def record_invalid(node):
+    # peer yang kirim chain tidak valid dikarantina, makin lama tiap pelanggaran
+    with health_lock:
+        entry = peer_entry(node)
+        entry['offenses'] += 1
+        entry['quarantined_until'] = time.time() + QUARANTINE_TIME * entry['offenses']
+
+def ranked_peers():
+    # hanya peer yang tidak sedang backoff/karantina, yang tercepat duluan
+    now = time.time()
+    with health_lock:
+        ready = [n for n in nodes
+                 if now >= peer_entry(n)['retry_at'] and now >= peer_entry(n)['quarantined_until']]
+        return sorted(ready, key=lambda n: peer_health[n]['latency'] or 0.0)
+
+def fetch_chain(node):
+    try:
+        started = time.time()
+        r = requests.get(f"{node}/get_chain", timeout=3)
+        if r.status_code == 200:
+            record_success(node, time.time() - started)
+            return r.json()
+    except:
+        pass
+    record_failure(node)
+    return None
+
+def sync_once():
     global blockchain
-    for node in nodes:
+    peers = ranked_peers()
+    if peers:
+        # poll every peer at once; peers still pending at SYNC_DEADLINE are skipped this round.
+        # backed-off and quarantined peers are not in the list, fastest peers go first
+        pool = ThreadPoolExecutor(max_workers=min(SYNC_WORKERS, len(peers)))
+        futures = {pool.submit(fetch_chain, node): node for node in peers}
         try:
-            r = requests.get(f"{node}/get_chain")
-            if r.status_code==200:
-                length = r.json()['length']
-                chain = r.json()['chain']
-                if length > len(blockchain.chain) and blockchain.is_chain_valid(chain):
-                    blockchain.chain = chain
-        except:
+            for future in as_completed(futures, timeout=SYNC_DEADLINE):
+                data = future.result()
+                try:
+                    if not data or data['length'] <= len(blockchain.chain):
+                        continue
+                    valid = blockchain.is_chain_valid(data['chain'])
+                except (KeyError, TypeError, ValueError, IndexError):
+                    valid = False  # respons rusak / chain tidak lengkap
+                if valid:
+                    with chain_lock:
+                        # chain kita bisa sudah bertambah selama validasi
+                        if data['length'] > len(blockchain.chain):
+                            blockchain.chain = data['chain']
+                else:
+                    record_invalid(futures[future])
+        except FuturesTimeout:
             pass
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def sync_chain():
+    sync_once()
     threading.Timer(10.0, sync_chain).start()  # sync tiap 10 detik
 
+def announce_block(block):
+    # kirim hash + index saja; peer ambil block-nya sendiri
+    message = {'hash': blockchain.hash(block), 'index': block['index'], 'port': PORT}
+    for node in ranked_peers():
+        announce_pool.submit(post_announcement, node, message)
+
+def post_announcement(node, message):
+    try:
+        requests.post(f"{node}/announce_block", json=message, timeout=3)
+    except:
+        record_failure(node)
+
+def receive_announcement(source, block_hash, index):
+    """
+    Block yang diumumkan langsung menyambung tip: ambil satu block itu,
+    validasi, append lalu teruskan ke peer lain. Selain itu fallback ke sync.
+    """
+    if index <= len(blockchain.chain):
+        return
+    if index > len(blockchain.chain) + 1:
+        sync_once()
+        return
+    try:
+        r = requests.get(f"{source}/get_chain", params={'offset': index - 1, 'limit': 1}, timeout=3)
+        blocks = r.json()['chain'] if r.status_code == 200 else []
+    except:
+        return
+    if not blocks or blockchain.hash(blocks[0]) != block_hash:
+        return
+    with chain_lock:
+        if len(blockchain.chain) != index - 1:
+            return
+        appended = blockchain.is_chain_valid([blockchain.chain[-1], blocks[0]])
+        if appended:
+            blockchain.chain.append(blocks[0])
+    if appended:
+        announce_block(blocks[0])
+    else:
+        sync_once()
+
 def run_flask():
     sync_chain()
-    app.run(host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=PORT)
 
 # ---------------------------
 # GUI FUNCTIONS
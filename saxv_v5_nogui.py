@@ -12,6 +12,10 @@ MAX_SUPPLY = 31_000_000
 
 # --- Simple Block class (light) ---
 class Block:
+    # hashed fields, in hash order; slots keep a long chain compact in RAM
+    HASH_FIELDS = ("index", "timestamp", "transactions", "previous_hash", "nonce")
+    __slots__ = HASH_FIELDS + ("hash",)
+
     def __init__(self, index, tx, prev_hash, timestamp=None, nonce=0, hash_value=None):
         self.index = int(index)
         self.transactions = tx
@@ -21,7 +25,7 @@ class Block:
         self.hash = hash_value if hash_value else self.calc_hash()
 
     def calc_hash(self):
-        s = f"{self.index}|{self.timestamp}|{self.transactions}|{self.previous_hash}|{self.nonce}"
+        s = "|".join(str(getattr(self, name)) for name in Block.HASH_FIELDS)
         return hashlib.sha256(s.encode()).hexdigest()
 
     def to_dict(self):
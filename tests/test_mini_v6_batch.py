@@ -0,0 +1,41 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+NODE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'saxv_chain_mini_v6.py')
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_node(tmp_path):
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, NODE, str(port)], cwd=tmp_path,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            requests.get(f'{url}/status', timeout=1)
+            return proc, url
+        except requests.exceptions.RequestException:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError('node did not start')
+
+def test_batch_accepts_more_than_single_submit_burst(tmp_path):
+    proc, url = start_node(tmp_path)
+    try:
+        txs = [{'sender': 'alice', 'recipient': 'bob', 'amount': i} for i in range(200)]
+        r = requests.post(f'{url}/transactions/batch', json={'transactions': txs}, timeout=30)
+        assert r.status_code == 200
+        data = r.json()
+        assert data['accepted'] == 200
+        assert all(result['status'] == 'accepted' for result in data['results'])
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)